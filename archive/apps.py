@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ArchiveConfig(AppConfig):
     name = 'archive'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,126 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CheckIn
+from .counters import add_checkins
+from place.models import Place
+from place.trending import CHECKIN_WEIGHT, add_scores, event_score, record_score
+
+# 장소 id의 최댓값 (BIGINT 범위를 넘는 값은 DB 조회 전에 거른다)
+MAX_PLACE_ID = 2 ** 63 - 1
+
+
+def parse_item(item, now):
+    """일괄 체크인 항목 하나를 (장소 id, 체크인 시각)으로 변환, 잘못된 항목이면 에러 메시지 반환"""
+    if not isinstance(item, dict):
+        return None, "INVALID_ITEM"
+
+    place_id  = item.get('place_id')
+    timestamp = item.get('client_timestamp')
+    if not isinstance(place_id, int) or isinstance(place_id, bool) or not isinstance(timestamp, str):
+        return None, "INVALID_ITEM"
+    if not 0 < place_id <= MAX_PLACE_ID:
+        return None, "INVALID_ITEM"
+
+    try:
+        checked_at = parse_datetime(timestamp)
+    except ValueError:
+        checked_at = None
+    if checked_at is None:
+        return None, "INVALID_TIMESTAMP"
+    if timezone.is_naive(checked_at):
+        checked_at = timezone.make_aware(checked_at)
+
+    if not now - timedelta(days = settings.CHECKIN_BATCH_MAX_AGE_DAYS) <= checked_at <= now + timedelta(seconds = settings.CHECKIN_BATCH_CLOCK_SKEW):
+        return None, "INVALID_TIMESTAMP"
+    return (place_id, checked_at), None
+
+
+def insert_each(pending):
+    """동시에 등록된 체크인과 충돌한 배치를 한 건씩 다시 저장하고 저장된 항목만 반환
+
+    같은 날 체크인이 없는데도 실패한 경우(유저 없음 등)는 IntegrityError를 다시 발생시킨다.
+    """
+    created = []
+    for index, checkin in pending:
+        try:
+            with transaction.atomic():
+                checkin.save(force_insert = True)
+            created.append((index, checkin))
+        except IntegrityError:
+            if not CheckIn.objects.filter(
+                user_id      = checkin.user_id,
+                place_id     = checkin.place_id,
+                checkin_date = checkin.checkin_date
+            ).exists():
+                raise
+    return created
+
+
+def sync_checkins(user_id, items):
+    """오프라인에서 쌓인 체크인 목록을 한 번에 반영
+
+    장소 확인과 같은 날 체크인 확인을 각각 한 번의 IN 쿼리로 처리하고 bulk_create로 저장한다.
+    하루 한 번 규칙은 클라이언트 체크인 시각의 날짜 기준으로 항목마다 적용한다.
+    반환값: 항목 순서대로 {"client_id", "place_id", "message"} 목록
+    """
+    now     = timezone.now()
+    results = [{"client_id": item.get('client_id') if isinstance(item, dict) else None, "place_id": None, "message": None} for item in items]
+    parsed  = {}
+
+    for index, item in enumerate(items):
+        values, error = parse_item(item, now)
+        if error:
+            results[index]['message'] = error
+        else:
+            parsed[index]              = values
+            results[index]['place_id'] = values[0]
+
+    place_ids = set(Place.objects.filter(id__in = {place_id for place_id, _ in parsed.values()}).values_list('id', flat = True)) if parsed else set()
+    existing  = set(
+        CheckIn.objects.filter(
+            user_id          = user_id,
+            place_id__in     = place_ids,
+            checkin_date__in = {timezone.localdate(checked_at) for _, checked_at in parsed.values()}
+        ).values_list('place_id', 'checkin_date')
+    ) if place_ids else set()
+
+    pending = []
+    for index, (place_id, checked_at) in parsed.items():
+        key = (place_id, timezone.localdate(checked_at))
+        if place_id not in place_ids:
+            results[index]['message'] = "INVALID_PLACE"
+        elif key in existing:
+            results[index]['message'] = "ALREADY_CHECKED_IN_TODAY"
+        else:
+            existing.add(key)
+            pending.append((index, CheckIn(user_id = user_id, place_id = place_id, checkin_date = key[1], created_at = checked_at)))
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                CheckIn.objects.bulk_create([checkin for _, checkin in pending])
+            created = pending
+        except IntegrityError:
+            created = insert_each(pending)
+
+        counts = Counter()
+        scores = {}
+        for _, checkin in created:
+            counts[checkin.place_id] += 1
+            scores[checkin.place_id]  = add_scores(scores.get(checkin.place_id), event_score(CHECKIN_WEIGHT, checkin.created_at))
+
+        for place_id in sorted(counts):
+            add_checkins(place_id, counts[place_id])
+            record_score(place_id, scores[place_id])
+
+    for index, _ in created:
+        results[index]['message'] = "CHECKED_IN"
+    for index, _ in pending:
+        results[index]['message'] = results[index]['message'] or "ALREADY_CHECKED_IN_TODAY"
+    return results
@@ -0,0 +1,64 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+
+from .models import Review
+from place.models import Place
+
+
+class ReviewPageCache:
+    """장소별 리뷰 목록 페이지 캐시
+
+    페이지 키에 장소의 review_version 컬럼을 포함한다. 해당 장소의 리뷰가 바뀌면 같은 트랜잭션에서
+    버전을 올려 이전 페이지들을 한 번에 무효화한다. 버전이 DB에 있으므로 워커 프로세스가 여러 개여도
+    모두 같은 버전을 본다. 페이지는 REVIEW_CACHE_ALIAS 백엔드에 저장하며, 기본 locmem 백엔드는
+    프로세스마다 따로 채워진다. (메모리만 중복되며 오래된 페이지를 반환하지는 않는다)
+    """
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[settings.REVIEW_CACHE_ALIAS]
+
+    def version(self, place_id):
+        """장소의 현재 리뷰 버전 (장소가 없거나 삭제되었으면 None)"""
+        return Place.objects.filter(id = place_id).values_list('review_version', flat = True).first()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_page(self, place_id, version, cursor, limit, build):
+        """version에 해당하는 캐시된 페이지를 반환하고, 없으면 build()로 만들어 저장"""
+        key  = f'reviews:{place_id}:{version}:{cursor or ""}:{limit}'
+        page = self.cache.get(key)
+
+        if page is None:
+            self._count('misses')
+            page = build()
+            self.cache.set(key, page)
+        else:
+            self._count('hits')
+        return page
+
+    def invalidate(self, place_id):
+        """장소의 모든 리뷰 페이지 캐시 무효화 (review_version 증가)"""
+        Place.all_objects.filter(id = place_id).update(review_version = F('review_version') + 1)
+
+    def invalidate_user(self, user_id):
+        """유저가 리뷰를 남긴 모든 장소의 리뷰 페이지 캐시 무효화 (닉네임 변경 등)"""
+        Place.all_objects.filter(
+            id__in = Review.all_objects.filter(user_id = user_id).values('place_id')
+        ).update(review_version = F('review_version') + 1)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self._stats['hits'], "misses": self._stats['misses']}
+
+
+review_cache = ReviewPageCache()
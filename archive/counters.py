@@ -0,0 +1,33 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from place.models import Place
+from .models import CheckIn, Review
+
+
+def add_checkins(place_id, delta):
+    """장소의 살아있는 체크인 수 증감 (체크인 변경과 같은 트랜잭션 안에서 호출)"""
+    Place.objects.filter(id = place_id).update(checkin_count = Greatest(F('checkin_count') + delta, Value(0)))
+
+
+def add_reviews(place_id, delta):
+    """장소의 살아있는 리뷰 수 증감 (리뷰 변경과 같은 트랜잭션 안에서 호출)"""
+    Place.objects.filter(id = place_id).update(review_count = Greatest(F('review_count') + delta, Value(0)))
+
+
+def live_count(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(place = OuterRef('pk'))
+                .order_by()
+                .values('place')
+                .annotate(count = Count('id'))
+                .values('count')
+        ),
+        Value(0)
+    )
+
+
+def rebuild_place_counters():
+    """모든 장소의 체크인 수, 리뷰 수를 실제 행 기준으로 다시 계산"""
+    return Place.all_objects.update(checkin_count = live_count(CheckIn), review_count = live_count(Review))
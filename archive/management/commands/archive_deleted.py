@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.purge import PURGE_BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = '삭제 후 보관 기간이 지난 리뷰, 체크인, 장소, 유저를 gzip NDJSON 파일로 옮기고 DB에서 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type = int, default = settings.SOFT_DELETE_RETENTION_DAYS, help = '삭제 후 보관 기간 (일)')
+        parser.add_argument('--batch-size', type = int, default = PURGE_BATCH_SIZE, help = '트랜잭션 하나에 옮길 행 수')
+        parser.add_argument('--output-dir', default = settings.SOFT_DELETE_ARCHIVE_DIR, help = '파일을 저장할 디렉터리')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            report = purge_deleted(Path(options['output_dir']), options['days'], options['batch_size'], log = self.stdout.write)
+        except OSError as e:
+            raise CommandError(e)
+
+        self.stdout.write(self.style.SUCCESS(', '.join(f'{name}: {count}' for name, count in report.items())))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from archive.counters import rebuild_place_counters
+
+
+class Command(BaseCommand):
+    help = '장소별 체크인 수, 리뷰 수를 체크인, 리뷰 테이블 기준으로 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_place_counters()
+        self.stdout.write(self.style.SUCCESS(f"rebuilt counters for {updated} places"))
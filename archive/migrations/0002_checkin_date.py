@@ -0,0 +1,57 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:56
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.utils.timezone
+
+
+def backfill_checkin_date(apps, schema_editor):
+    """기존 체크인의 created_at을 현지 날짜로 변환하여 checkin_date를 채움
+
+    같은 유저, 장소, 날짜에 살아있는 체크인이 이미 있으면 고유 제약과 충돌하지 않도록 비워둔다.
+    """
+    CheckIn = apps.get_model('archive', 'CheckIn')
+    seen    = set()
+    batch   = []
+
+    for checkin in CheckIn.objects.order_by('created_at', 'id').iterator():
+        checkin_date = timezone.localdate(checkin.created_at)
+        key          = (checkin.user_id, checkin.place_id, checkin_date)
+
+        if checkin.deleted_at is None:
+            if key in seen:
+                continue
+            seen.add(key)
+
+        checkin.checkin_date = checkin_date
+        batch.append(checkin)
+        if len(batch) >= 500:
+            CheckIn.objects.bulk_update(batch, ['checkin_date'])
+            batch = []
+
+    CheckIn.objects.bulk_update(batch, ['checkin_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkin',
+            name='checkin_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(backfill_checkin_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='checkin',
+            name='checkin_date',
+            field=models.DateField(default=django.utils.timezone.localdate, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='checkin',
+            constraint=models.UniqueConstraint(condition=models.Q(deleted_at__isnull=True), fields=('user', 'place', 'checkin_date'), name='checkins_unique_daily_checkin'),
+        ),
+    ]
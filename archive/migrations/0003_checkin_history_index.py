@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0002_checkin_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkin',
+            index=models.Index(fields=['user', 'place', 'deleted_at', 'created_at'], name='checkins_history_idx'),
+        ),
+    ]
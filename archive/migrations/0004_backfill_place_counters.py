@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_place_counters(apps, schema_editor):
+    """기존 장소의 체크인 수, 리뷰 수를 살아있는 행 기준으로 채움"""
+    Place   = apps.get_model('place', 'Place')
+    CheckIn = apps.get_model('archive', 'CheckIn')
+    Review  = apps.get_model('archive', 'Review')
+
+    def live_count(model):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(place = OuterRef('pk'), deleted_at__isnull = True)
+                    .order_by()
+                    .values('place')
+                    .annotate(count = Count('id'))
+                    .values('count')
+            ),
+            Value(0)
+        )
+
+    Place.objects.update(checkin_count = live_count(CheckIn), review_count = live_count(Review))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0003_checkin_history_index'),
+        ('place', '0004_place_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_place_counters, migrations.RunPython.noop),
+    ]
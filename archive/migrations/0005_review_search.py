@@ -0,0 +1,55 @@
+import re
+
+from django.db import migrations
+
+# 이후 archive.search가 바뀌어도 이 마이그레이션의 결과가 달라지지 않도록 작성 시점의 토크나이저를 복사해 둔다
+SEARCH_TABLE = 'review_search'
+REGEX_WORD   = re.compile(r'\w+')
+
+
+def tokenize(text):
+    tokens = []
+    for word in REGEX_WORD.findall(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def place_token(place_id):
+    return f'placeid{place_id}'
+
+
+def create_review_search(apps, schema_editor):
+    """리뷰 본문 검색용 FTS5 테이블을 만들고 기존 살아있는 리뷰를 색인 (SQLite 전용)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    Review = apps.get_model('archive', 'Review')
+    schema_editor.execute(f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(tokens)')
+
+    rows = (
+        (review_id, ' '.join([place_token(place_id), *tokenize(body)]))
+        for review_id, place_id, body in Review.objects.filter(deleted_at__isnull = True).values_list('id', 'place_id', 'body').iterator()
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, tokens) VALUES (%s, %s)', rows)
+
+
+def drop_review_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0004_backfill_place_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_review_search, drop_review_search),
+    ]
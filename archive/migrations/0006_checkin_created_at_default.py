@@ -0,0 +1,19 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0005_review_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkin',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,16 +1,33 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 from place.models import Place
 from user.models  import User
+from theplaces.managers import LiveManager
 
 class CheckIn(models.Model):
-    user       = models.ForeignKey('user.User', on_delete=models.CASCADE)
-    place      = models.ForeignKey('place.Place', on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
-    deleted_at = models.DateTimeField(null=True)
+    user         = models.ForeignKey('user.User', on_delete=models.CASCADE)
+    place        = models.ForeignKey('place.Place', on_delete=models.CASCADE)
+    checkin_date = models.DateField(default=timezone.localdate, null=True)
+    created_at   = models.DateTimeField(default=timezone.now)
+    deleted_at   = models.DateTimeField(null=True)
+
+    objects      = LiveManager()
+    all_objects  = models.Manager()
 
     class Meta:
-        db_table = 'checkins'
+        db_table    = 'checkins'
+        indexes     = [
+            models.Index(fields = ['user', 'place', 'deleted_at', 'created_at'], name = 'checkins_history_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields    = ['user', 'place', 'checkin_date'],
+                condition = Q(deleted_at__isnull=True),
+                name      = 'checkins_unique_daily_checkin'
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -21,6 +38,9 @@ class Review(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True)
 
+    objects     = LiveManager()
+    all_objects = models.Manager()
+
     class Meta:
         db_table = 'reviews'
 
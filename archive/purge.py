@@ -0,0 +1,106 @@
+import gzip
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CheckIn, Review
+from place.models import Place, ChangeSequence
+from user.models import User
+from theplaces.serialization import dumps_json
+
+PURGE_BATCH_SIZE = 500
+CHECKPOINT_FILE  = 'checkpoint.json'
+
+# (이름, 모델, 남아 있으면 지울 수 없는 자식 (모델, 필드)) 순서대로 처리
+PURGE_TARGETS = (
+    ('reviews', Review, ()),
+    ('checkins', CheckIn, ()),
+    ('places', Place, ((CheckIn, 'place'), (Review, 'place'))),
+    ('users', User, ((CheckIn, 'user'), (Review, 'user'))),
+)
+
+
+def purgeable(model, blockers, cutoff, after_id):
+    """cutoff 전에 삭제되었고, 참조하는 자식 행이 남아 있지 않은 행 (id순)
+
+    장소, 유저를 지우면 자식 행이 CASCADE로 함께 지워지므로, 살아있는 체크인, 리뷰가 남은 행은 건너뛴다.
+    """
+    rows = model.all_objects.filter(deleted_at__lt = cutoff, id__gt = after_id).order_by('id')
+    for child, field in blockers:
+        rows = rows.exclude(Exists(child.all_objects.filter(**{field: OuterRef('pk')})))
+    return rows
+
+
+def purge_batch(model, blockers, cutoff, after_id, batch_size, archive_path):
+    """한 배치를 gzip NDJSON 파일에 덧붙인 뒤 DB에서 삭제하고 (처리 수, 마지막 id) 반환
+
+    파일을 먼저 쓰고 삭제하므로 중간에 실패하면 같은 행이 파일에 두 번 남을 수 있다. (id로 중복 제거)
+    """
+    with transaction.atomic():
+        rows = list(purgeable(model, blockers, cutoff, after_id).values()[:batch_size])
+        if not rows:
+            return 0, after_id
+
+        with gzip.open(archive_path, 'ab') as archive:
+            archive.write(b''.join(dumps_json(row) + b'\n' for row in rows))
+
+        ids = [row['id'] for row in rows]
+        if model is Place:
+            ChangeSequence.raise_to(Place.PURGED_SEQUENCE, max(row['change_seq'] for row in rows))
+        model.all_objects.filter(id__in = ids).delete()
+    return len(rows), ids[-1]
+
+
+def load_checkpoint(output_dir):
+    path = output_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return None
+
+    checkpoint           = json.loads(path.read_text())
+    checkpoint['cutoff'] = parse_datetime(checkpoint['cutoff'])
+    return checkpoint
+
+
+def save_checkpoint(output_dir, checkpoint):
+    path = output_dir / CHECKPOINT_FILE
+    temp = path.with_suffix('.tmp')
+    temp.write_text(json.dumps({**checkpoint, 'cutoff': checkpoint['cutoff'].isoformat()}))
+    temp.replace(path)
+
+
+def purge_deleted(output_dir, retention_days, batch_size = PURGE_BATCH_SIZE, log = None):
+    """보관 기간이 지난 삭제 행을 리뷰, 체크인, 장소, 유저 순으로 파일에 옮기고 삭제
+
+    배치마다 진행 위치를 output_dir의 checkpoint.json에 기록하며, 중단된 실행은 같은 기준 시각으로 이어서 진행한다.
+    모두 끝나면 checkpoint.json을 지운다. 반환값: {이름: 옮긴 행 수}
+    """
+    output_dir.mkdir(parents = True, exist_ok = True)
+    checkpoint = load_checkpoint(output_dir) or {
+        'cutoff'    : timezone.now() - timedelta(days = retention_days),
+        'positions' : {},
+    }
+    stamp  = checkpoint['cutoff'].strftime('%Y%m%d%H%M%S')
+    report = {}
+
+    for name, model, blockers in PURGE_TARGETS:
+        archive_path = output_dir / f'{name}-{stamp}.ndjson.gz'
+        after_id     = checkpoint['positions'].get(name, 0)
+        report[name] = 0
+
+        while True:
+            count, after_id = purge_batch(model, blockers, checkpoint['cutoff'], after_id, batch_size, archive_path)
+            if not count:
+                break
+
+            report[name]                  += count
+            checkpoint['positions'][name]  = after_id
+            save_checkpoint(output_dir, checkpoint)
+            if log:
+                log(f'{name}: {report[name]} archived (last id {after_id})')
+
+    (output_dir / CHECKPOINT_FILE).unlink(missing_ok = True)
+    return report
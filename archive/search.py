@@ -0,0 +1,92 @@
+import re
+
+from django.db import connection
+
+from .models import Review
+
+SEARCH_TABLE = 'review_search'
+REGEX_WORD   = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """검색용 토큰 목록: 단어마다 2글자 n-gram (한 글자 단어는 그대로)"""
+    tokens = []
+    for word in REGEX_WORD.findall(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def place_token(place_id):
+    """장소 범위 검색용 토큰 (2글자 n-gram과 겹치지 않는 길이)"""
+    return f'placeid{place_id}'
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def index_review(review):
+    """리뷰를 검색 인덱스에 반영 (삭제된 리뷰는 인덱스에서 제거)"""
+    if not is_supported():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [review.id])
+        if review.deleted_at is None:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, tokens) VALUES (%s, %s)',
+                [review.id, ' '.join([place_token(review.place_id), *tokenize(review.body)])]
+            )
+
+
+def remove_review(review_id):
+    if not is_supported():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [review_id])
+
+
+def build_match(query, place_id = None):
+    """검색어를 FTS5 MATCH 식으로 변환 (모든 토큰 AND, 한 글자 토큰은 접두어 검색)"""
+    terms = [f'"{token}"*' if len(token) == 1 else f'"{token}"' for token in tokenize(query)]
+    if not terms:
+        raise ValueError("INVALID_QUERY")
+    if place_id is not None:
+        terms.insert(0, f'"{place_token(place_id)}"')
+    return ' AND '.join(terms)
+
+
+def search_review_ids(query, place_id, limit, offset):
+    """검색어와 일치하는 살아있는 리뷰 id를 관련도순으로 반환
+
+    SQLite가 아닌 DB에서는 단어별 LIKE 검색으로 대체하며 최신순으로 반환한다.
+    """
+    if not is_supported():
+        return like_search_review_ids(query, place_id, limit, offset)
+
+    match = build_match(query, place_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'ORDER BY bm25({SEARCH_TABLE}), rowid LIMIT %s OFFSET %s',
+            [match, limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def like_search_review_ids(query, place_id, limit, offset):
+    words = REGEX_WORD.findall(query)
+    if not words:
+        raise ValueError("INVALID_QUERY")
+
+    reviews = Review.objects.all()
+    if place_id is not None:
+        reviews = reviews.filter(place_id = place_id)
+    for word in words:
+        reviews = reviews.filter(body__icontains = word)
+    return list(reviews.order_by('-id').values_list('id', flat = True)[offset:offset + limit])
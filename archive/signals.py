@@ -0,0 +1,40 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import review_cache
+from .search import index_review, remove_review
+from .models import Review
+from place.models import Place
+from user.models import User
+
+
+@receiver(post_save, sender = Review)
+@receiver(post_delete, sender = Review)
+def invalidate_review_cache(sender, instance, **kwargs):
+    """리뷰 작성, 수정, 삭제 시 해당 장소의 리뷰 페이지 캐시 무효화 (변경과 같은 트랜잭션에서 버전 증가)"""
+    review_cache.invalidate(instance.place_id)
+
+
+@receiver(post_save, sender = Place)
+def invalidate_deleted_place_reviews(sender, instance, **kwargs):
+    """장소 소프트 삭제 시 리뷰 페이지 캐시 무효화"""
+    if instance.deleted_at is not None:
+        review_cache.invalidate(instance.id)
+
+
+@receiver(post_save, sender = User)
+def invalidate_user_reviews(sender, instance, created, update_fields = None, **kwargs):
+    """닉네임이 바뀔 수 있는 유저 저장 시 유저가 리뷰를 남긴 장소들의 리뷰 페이지 캐시 무효화"""
+    if not created and (update_fields is None or 'nickname' in update_fields):
+        review_cache.invalidate_user(instance.id)
+
+
+@receiver(post_save, sender = Review)
+def update_review_search(sender, instance, **kwargs):
+    """리뷰 작성, 수정, 소프트 삭제 시 검색 인덱스 반영"""
+    index_review(instance)
+
+
+@receiver(post_delete, sender = Review)
+def delete_review_search(sender, instance, **kwargs):
+    remove_review(instance.id)
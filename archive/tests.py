@@ -1,14 +1,28 @@
+import gzip
 import json
+import tempfile
+import threading
 import bcrypt
 import jwt
-from datetime import timedelta
-
-from django.test import TestCase, Client
+from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from .models import CheckIn, Review
+from .views import AsyncCheckInView, AsyncReviewView
+from theplaces.async_views import run_db
+from theplaces.utils import encode_cursor
 from place.models import MetroRegion, LocalRegion, PlaceType, Place
 from user.models import User
+from user.cache import user_cache
 
 from local_settings import SECRET_KEY, ALGORITHM
 
@@ -54,6 +68,17 @@ class CheckInTest(TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json(), {"message": "CHECKED_IN"})
 
+    def test_checkin_create_without_user_query(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+        user_cache.check_live(User.objects.get(email = 'test@test.com').id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/archive/checkin/place/1', **header, content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([query['sql'] for query in queries if '"users"' in query['sql']], [])
+
     def test_checkin_create_duplicate(self):
         client = Client()
         header = {"HTTP_Authorization": self.token_duplicate}
@@ -63,15 +88,140 @@ class CheckInTest(TestCase):
         self.assertEqual(response.json(), {"message": "ALREADY_CHECKED_IN_TODAY"})
 
 
+    def test_checkin_create_next_day(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token_duplicate}
+        CheckIn.objects.filter(user__nickname = 'duplicattestuser').update(checkin_date = timezone.localdate() - timedelta(days = 1))
+
+        response = client.post('/archive/checkin/place/1', **header, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"message": "CHECKED_IN"})
+
+    def test_checkin_create_after_delete(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token_read}
+
+        response = client.post('/archive/checkin/place/1', **header, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "ALREADY_CHECKED_IN_TODAY"})
+
+        client.delete('/archive/checkin/2', **header, content_type='application/json')
+
+        response = client.post('/archive/checkin/place/1', **header, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"message": "CHECKED_IN"})
+
+    def test_checkin_batch(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+        now    = timezone.now()
+        data   = {
+                'checkins': [
+                    {'client_id': 'a', 'place_id': 1, 'client_timestamp': now.isoformat()},
+                    {'client_id': 'b', 'place_id': 1, 'client_timestamp': (now - timedelta(minutes = 1)).isoformat()},
+                    {'client_id': 'c', 'place_id': 1, 'client_timestamp': (now - timedelta(days = 1)).isoformat()},
+                    {'client_id': 'd', 'place_id': 999, 'client_timestamp': now.isoformat()},
+                    {'client_id': 'e', 'place_id': 1, 'client_timestamp': (now - timedelta(days = 30)).isoformat()},
+                    {'client_id': 'f', 'place_id': '1', 'client_timestamp': now.isoformat()},
+                ]
+                }
+
+        response = client.post('/archive/checkin/batch', json.dumps(data), **header, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(item['client_id'], item['message']) for item in response.json()['result']], [
+            ('a', 'CHECKED_IN'),
+            ('b', 'ALREADY_CHECKED_IN_TODAY'),
+            ('c', 'CHECKED_IN'),
+            ('d', 'INVALID_PLACE'),
+            ('e', 'INVALID_TIMESTAMP'),
+            ('f', 'INVALID_ITEM'),
+        ])
+
+        checkins = CheckIn.objects.filter(user__nickname = 'testuser').order_by('created_at')
+        self.assertEqual([checkin.checkin_date for checkin in checkins], [timezone.localdate(now - timedelta(days = 1)), timezone.localdate(now)])
+        self.assertEqual(Place.objects.get(id = 1).checkin_count, 2)
+
+        response = client.post('/archive/checkin/batch', json.dumps({'checkins': data['checkins'][:1]}), **header, content_type='application/json')
+        self.assertEqual(response.json()['result'][0]['message'], 'ALREADY_CHECKED_IN_TODAY')
+
+    def test_checkin_batch_invalid(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+
+        response = client.post('/archive/checkin/batch', json.dumps({'checkins': []}), **header, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_BATCH"})
+        self.assertEqual(response.status_code, 400)
+
+        response = client.post('/archive/checkin/batch', json.dumps([1]), **header, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_BATCH"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_checkin_batch_invalid_place_id(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+        now    = timezone.now().isoformat()
+        data   = {
+                'checkins': [
+                    {'client_id': 'a', 'place_id': 2 ** 70, 'client_timestamp': now},
+                    {'client_id': 'b', 'place_id': 0, 'client_timestamp': now},
+                    {'client_id': 'c', 'place_id': 1, 'client_timestamp': now},
+                ]
+                }
+
+        response = client.post('/archive/checkin/batch', json.dumps(data), **header, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['message'] for item in response.json()['result']], ['INVALID_ITEM', 'INVALID_ITEM', 'CHECKED_IN'])
+
     def test_checkin_read(self):
         client  = Client()
         header  = {"HTTP_Authorization": self.token_read}
 
 
         response = client.get('/archive/checkin/place/1', **header, content_type='application/json')
-        self.assertEqual(response.json(), {'result': [{'id':2, 'created_at': self.create_time.strftime('%Y-%m-%d')}]})
+        self.assertEqual(response.json(), {'result': [{'id':2, 'created_at': timezone.localdate().strftime('%Y-%m-%d')}], 'next': None})
         self.assertEqual(response.status_code, 200)
 
+    def test_checkin_read_local_date(self):
+        client  = Client()
+        header  = {"HTTP_Authorization": self.token_read}
+        user    = User.objects.get(nickname = 'deletetestuser')
+        place   = Place.objects.get(id = 1)
+        morning = timezone.make_aware(datetime(2021, 3, 2, 7, 0))
+        CheckIn.objects.filter(id = 2).delete()
+        CheckIn.objects.create(id = 11, user = user, place = place, checkin_date = morning.date(), created_at = morning)
+        CheckIn.objects.create(id = 12, user = user, place = place, checkin_date = None, created_at = morning - timedelta(days = 1))
+
+        response = client.get('/archive/checkin/place/1', {'from': '2021-03-01', 'to': '2021-03-02'}, **header, content_type='application/json')
+        self.assertEqual(response.json()['result'], [{'id': 11, 'created_at': '2021-03-02'}, {'id': 12, 'created_at': '2021-03-01'}])
+
+    def test_checkin_read_pagination(self):
+        client  = Client()
+        header  = {"HTTP_Authorization": self.token_read}
+        user    = User.objects.get(nickname = 'deletetestuser')
+        place   = Place.objects.get(id = 1)
+        for days in range(1, 4):
+            checkin = CheckIn.objects.create(id = 10 + days, user = user, place = place, checkin_date = timezone.localdate() - timedelta(days = days))
+            CheckIn.objects.filter(id = checkin.id).update(created_at = self.create_time - timedelta(days = days))
+
+        response = client.get('/archive/checkin/place/1', {'limit': 2}, **header, content_type='application/json')
+        self.assertEqual([checkin['id'] for checkin in response.json()['result']], [2, 11])
+
+        response = client.get('/archive/checkin/place/1', {'limit': 2, 'cursor': response.json()['next']}, **header, content_type='application/json')
+        self.assertEqual([checkin['id'] for checkin in response.json()['result']], [12, 13])
+        self.assertEqual(response.json()['next'], None)
+
+        date_from = timezone.localtime(self.create_time - timedelta(days = 2)).strftime('%Y-%m-%d')
+        date_to   = timezone.localtime(self.create_time - timedelta(days = 1)).strftime('%Y-%m-%d')
+        response  = client.get('/archive/checkin/place/1', {'from': date_from, 'to': date_to}, **header, content_type='application/json')
+        self.assertEqual([checkin['id'] for checkin in response.json()['result']], [11, 12])
+
+    def test_checkin_read_invalid_date(self):
+        client   = Client()
+        header   = {"HTTP_Authorization": self.token_read}
+
+        response = client.get('/archive/checkin/place/1', {'from': '2021-13-01'}, **header, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_DATE"})
+        self.assertEqual(response.status_code, 400)
+
     def test_checkin_delete_unauthorized(self):
         client = Client()
         header = {"HTTP_Authorization": self.token}
@@ -86,7 +236,7 @@ class CheckInTest(TestCase):
         
         response = client.delete('/archive/checkin/2', **header, content_type='appliation/json')
         self.assertEqual(response.status_code, 204)
-        self.assertEqual(CheckIn.objects.get(id = 2).deleted_at == None, False)
+        self.assertEqual(CheckIn.all_objects.get(id = 2).deleted_at == None, False)
     
     def test_checkin_delete_invalid(self):
         client  = Client()
@@ -99,6 +249,7 @@ class CheckInTest(TestCase):
 
 class ReviewTest(TestCase):
     def setUp(self):
+        caches[settings.REVIEW_CACHE_ALIAS].clear()
         test_metro   = MetroRegion.objects.create(name='테스트광역시')
         test_local   = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
         test_type    = PlaceType.objects.create(name='테스트타입')
@@ -137,10 +288,107 @@ class ReviewTest(TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json(), {"message": "REVIEW_CREATED"})
 
+    def test_review_invalid_body(self):
+        client = Client()
+
+        response = client.post('/archive/review/place/1', {'body': 123}, HTTP_Authorization = self.token, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_BODY"})
+        self.assertEqual(response.status_code, 400)
+
+        response = client.patch('/archive/review/2', {'body': ['리뷰']}, HTTP_Authorization = self.token_rud, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_BODY"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Review.objects.get(id = 2).body, '테스트 리뷰입니다.')
+
     def test_review_read(self):
         client = Client()
         response = client.get('/archive/review/place/1', content_type='application/json')
-        self.assertEqual(response.json(), {"result": [{'body': '테스트 리뷰입니다.', 'created_at': self.create_time.strftime('%Y-%m-%d'), 'id': 2, 'user': 'ruduser'}]})
+        self.assertEqual(response.json(), {"result": [{'body': '테스트 리뷰입니다.', 'created_at': self.create_time.strftime('%Y-%m-%d'), 'id': 2, 'user': 'ruduser'}], "next": None})
+        self.assertEqual(response.status_code, 200)
+
+    def test_review_read_cached(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+        client.get('/archive/review/place/1', {'limit': 1}, content_type='application/json')
+
+        with self.assertNumQueries(1):
+            response = client.get('/archive/review/place/1', {'limit': 1}, content_type='application/json')
+        self.assertEqual([review['id'] for review in response.json()['result']], [2])
+
+        client.post('/archive/review/place/1', {'body': '새 리뷰입니다.'}, **header, content_type='application/json')
+        client.patch('/archive/review/2', {'body': '수정 리뷰입니다.'}, HTTP_Authorization = self.token_rud, content_type='application/json')
+
+        response = client.get('/archive/review/place/1', {'limit': 1}, content_type='application/json')
+        self.assertEqual([review['body'] for review in response.json()['result']], ['수정 리뷰입니다.'])
+
+        response = client.get('/archive/review/place/1', {'limit': 1, 'cursor': response.json()['next']}, content_type='application/json')
+        self.assertEqual([review['body'] for review in response.json()['result']], ['새 리뷰입니다.'])
+
+    def test_review_read_deleted_place(self):
+        client = Client()
+        client.get('/archive/review/place/1', content_type='application/json')
+
+        client.delete('/place/1', content_type='application/json')
+
+        response = client.get('/archive/review/place/1', content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_PLACE"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_review_read_nickname_changed(self):
+        client = Client()
+        client.get('/archive/review/place/1', content_type='application/json')
+
+        user          = User.objects.get(nickname = 'ruduser')
+        user.nickname = 'renamed'
+        user.save()
+
+        response = client.get('/archive/review/place/1', content_type='application/json')
+        self.assertEqual([review['user'] for review in response.json()['result']], ['renamed'])
+
+    def test_review_version_kept_on_place_save(self):
+        place = Place.objects.get(id = 1)
+        Review.objects.create(user = User.objects.get(nickname = 'testuser'), place = place, body = '새 리뷰입니다.')
+        Place.objects.filter(id = 1).update(review_count = 5)
+
+        place.name = '수정'
+        place.save()
+
+        self.assertEqual(Place.objects.get(id = 1).review_version, place.review_version + 1)
+        self.assertEqual(Place.objects.get(id = 1).review_count, 5)
+
+    def test_review_read_not_modified(self):
+        client   = Client()
+        response = client.get('/archive/review/place/1', content_type='application/json')
+        etag     = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = client.get('/archive/review/place/1', content_type='application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 304)
+
+        client.post('/archive/review/place/1', {'body': '새 리뷰입니다.'}, HTTP_Authorization = self.token, content_type='application/json')
+        response = client.get('/archive/review/place/1', content_type='application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['result']), 2)
+
+    def test_review_read_not_modified_invalid_place(self):
+        client   = Client()
+        response = client.get('/archive/review/place/1', content_type='application/json')
+        etag     = response['ETag']
+
+        response = client.get('/archive/review/place/99', content_type='application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.json(), {"message": "INVALID_PLACE"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+
+        client.delete('/place/1', content_type='application/json')
+        response = client.get('/archive/review/place/1', content_type='application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_review_read_stream(self):
+        client   = Client()
+        response = client.get('/archive/review/place/1', {'stream': '1'}, content_type='application/json')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), {"result": [{'body': '테스트 리뷰입니다.', 'created_at': self.create_time.strftime('%Y-%m-%d'), 'id': 2, 'user': 'ruduser'}]})
         self.assertEqual(response.status_code, 200)
 
     def test_review_patch(self):
@@ -161,7 +409,7 @@ class ReviewTest(TestCase):
         
         response = client.delete('/archive/review/2', **header, content_type='application/json')
         self.assertEqual(response.status_code, 204)
-        self.assertEqual(Review.objects.get(id = 2).deleted_at == None, False)
+        self.assertEqual(Review.all_objects.get(id = 2).deleted_at == None, False)
     
     def test_review_invalid(self):
         client = Client()
@@ -174,3 +422,233 @@ class ReviewTest(TestCase):
 
 
 
+
+
+class PlaceCounterTest(TestCase):
+    def setUp(self):
+        caches[settings.REVIEW_CACHE_ALIAS].clear()
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        self.place = Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '테스트')
+
+        test_user  = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+        self.token = jwt.encode({'id': test_user.id, 'exp': timezone.now() + timedelta(hours = 24)}, SECRET_KEY, algorithm=ALGORITHM)
+
+    def tearDown(self):
+        User.objects.all().delete()
+        CheckIn.objects.all().delete()
+        Review.objects.all().delete()
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_counters(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+
+        client.post('/archive/checkin/place/1', **header, content_type='application/json')
+        client.post('/archive/review/place/1', {'body': '테스트 리뷰입니다.'}, **header, content_type='application/json')
+        client.post('/archive/review/place/1', {'body': '테스트 리뷰입니다.'}, **header, content_type='application/json')
+        self.place.refresh_from_db()
+        self.assertEqual((self.place.checkin_count, self.place.review_count), (1, 2))
+
+        client.delete(f'/archive/checkin/{CheckIn.objects.get().id}', **header, content_type='application/json')
+        client.delete(f'/archive/review/{Review.objects.first().id}', **header, content_type='application/json')
+        self.place.refresh_from_db()
+        self.assertEqual((self.place.checkin_count, self.place.review_count), (0, 1))
+
+    def test_rebuild_command(self):
+        user = User.objects.get()
+        CheckIn.objects.create(user = user, place = self.place)
+        Review.objects.create(user = user, place = self.place, body = '테스트 리뷰입니다.', deleted_at = timezone.now())
+        Place.objects.update(review_count = 5)
+
+        call_command('rebuild_place_counters', stdout = StringIO())
+
+        self.place.refresh_from_db()
+        self.assertEqual((self.place.checkin_count, self.place.review_count), (1, 0))
+
+
+class ReviewSearchTest(TestCase):
+    def setUp(self):
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '테스트')
+        Place.objects.create(id = 2, place_type = test_type, region = test_local, road_address = '테스트로 2', name = '테스트2')
+
+        test_user  = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+        self.token = jwt.encode({'id': test_user.id, 'exp': timezone.now() + timedelta(hours = 24)}, SECRET_KEY, algorithm=ALGORITHM)
+
+        Review.objects.create(id = 1, user = test_user, place_id = 1, body = '아메리카노가 맛있는 카페입니다.')
+        Review.objects.create(id = 2, user = test_user, place_id = 2, body = '아메리카노는 평범하고 케이크가 맛있어요.')
+        Review.objects.create(id = 3, user = test_user, place_id = 1, body = '분위기 좋은 카페', deleted_at = timezone.now())
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Review.objects.all().delete()
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_search(self):
+        client = Client()
+
+        response = client.get('/archive/review/search', {'q': '아메리카노'}, content_type='application/json')
+        self.assertEqual(sorted(review['id'] for review in response.json()['result']), [1, 2])
+        self.assertEqual(response.status_code, 200)
+
+        response = client.get('/archive/review/search', {'q': '아메리카노', 'place_id': 2}, content_type='application/json')
+        self.assertEqual([review['id'] for review in response.json()['result']], [2])
+
+        response = client.get('/archive/review/search', {'q': '카페'}, content_type='application/json')
+        self.assertEqual([review['id'] for review in response.json()['result']], [1])
+
+    def test_search_sync(self):
+        client = Client()
+        header = {"HTTP_Authorization": self.token}
+
+        client.patch('/archive/review/1', {'body': '케이크 맛집'}, **header, content_type='application/json')
+        client.delete('/archive/review/2', **header, content_type='application/json')
+
+        response = client.get('/archive/review/search', {'q': '케이크'}, content_type='application/json')
+        self.assertEqual([review['id'] for review in response.json()['result']], [1])
+
+        response = client.get('/archive/review/search', {'q': '아메리카노'}, content_type='application/json')
+        self.assertEqual(response.json(), {"result": [], "next": None})
+
+    def test_search_pagination(self):
+        client = Client()
+
+        response = client.get('/archive/review/search', {'q': '맛', 'limit': 1}, content_type='application/json')
+        first    = response.json()['result']
+
+        response = client.get('/archive/review/search', {'q': '맛', 'limit': 1, 'cursor': response.json()['next']}, content_type='application/json')
+        self.assertEqual(sorted(review['id'] for review in first + response.json()['result']), [1, 2])
+        self.assertEqual(response.json()['next'], None)
+
+    def test_search_invalid_query(self):
+        client = Client()
+
+        response = client.get('/archive/review/search', {'q': '!!'}, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "INVALID_QUERY"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ASYNC_DB_WORKERS = 0)
+class AsyncViewTest(TestCase):
+    def setUp(self):
+        caches[settings.REVIEW_CACHE_ALIAS].clear()
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        test_place = Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '테스트')
+        test_user  = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+        self.token = jwt.encode({'id': test_user.id, 'exp': timezone.now() + timedelta(hours = 24)}, SECRET_KEY, algorithm=ALGORITHM)
+        Review.objects.create(id = 1, user = test_user, place = test_place, body = '테스트 리뷰입니다.')
+
+    def tearDown(self):
+        User.objects.all().delete()
+        Review.objects.all().delete()
+        CheckIn.objects.all().delete()
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    async def test_async_checkin(self):
+        factory = RequestFactory()
+        view    = AsyncCheckInView.as_view()
+
+        response = await view(factory.post('/archive/checkin/place/1', HTTP_Authorization = self.token), place_pk = 1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content), {"message": "CHECKED_IN"})
+
+        response = await view(factory.post('/archive/checkin/place/1', HTTP_Authorization = self.token), place_pk = 1)
+        self.assertEqual(json.loads(response.content), {"message": "ALREADY_CHECKED_IN_TODAY"})
+
+        response = await view(factory.get('/archive/checkin/place/1', HTTP_Authorization = 'invalid'), place_pk = 1)
+        self.assertEqual(json.loads(response.content), {"message": "INVALID_TOKEN"})
+
+    async def test_async_review_read(self):
+        factory = RequestFactory()
+        view    = AsyncReviewView.as_view()
+
+        response = await view(factory.get('/archive/review/place/1'), place_pk = 1)
+        self.assertEqual([review['id'] for review in json.loads(response.content)['result']], [1])
+
+        response = await view(factory.get('/archive/review/place/1', {'stream': '1'}), place_pk = 1)
+        self.assertEqual(json.loads(response.content), {"message": "STREAM_NOT_SUPPORTED"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ASYNC_DB_WORKERS = 2)
+    async def test_run_db_pool(self):
+        thread_name = await run_db(lambda: threading.current_thread().name)
+        self.assertTrue(thread_name.startswith('async-db'))
+
+
+class ArchiveDeletedTest(TestCase):
+    def setUp(self):
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        old        = timezone.now() - timedelta(days = 60)
+
+        live_place    = Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '살아있음')
+        deleted_place = Place.objects.create(id = 2, place_type = test_type, region = test_local, road_address = '테스트로 2', name = '삭제됨')
+        blocked_place = Place.objects.create(id = 3, place_type = test_type, region = test_local, road_address = '테스트로 3', name = '체크인남음')
+        user          = User.objects.create(id = 1, email = 'test@test.com', password = 'password', nickname = 'testuser')
+        deleted_user  = User.objects.create(id = 2, email = 'deleted@test.com', password = 'password', nickname = 'deleteduser')
+
+        Review.objects.create(id = 1, user = user, place = live_place, body = '오래전 삭제')
+        Review.objects.create(id = 2, user = user, place = live_place, body = '최근 삭제', deleted_at = timezone.now())
+        Review.objects.create(id = 3, user = user, place = live_place, body = '살아있음')
+        CheckIn.objects.create(id = 1, user = user, place = live_place, checkin_date = None)
+        CheckIn.objects.create(id = 2, user = user, place = blocked_place)
+
+        Review.all_objects.filter(id = 1).update(deleted_at = old)
+        CheckIn.all_objects.filter(id = 1).update(deleted_at = old)
+        Place.all_objects.filter(id__in = [deleted_place.id, blocked_place.id]).update(deleted_at = old)
+        User.all_objects.filter(id = deleted_user.id).update(deleted_at = old)
+
+    def tearDown(self):
+        User.all_objects.all().delete()
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.all_objects.all().delete()
+
+    def test_live_managers(self):
+        self.assertEqual(sorted(Review.objects.values_list('id', flat = True)), [3])
+        self.assertEqual(sorted(Place.objects.values_list('id', flat = True)), [1])
+        self.assertEqual(sorted(Place.all_objects.values_list('id', flat = True)), [1, 2, 3])
+
+    def test_archive_deleted(self):
+        client = Client()
+        before = encode_cursor(Place.objects.get(id = 1).change_seq)
+        latest = client.get('/place/changes', content_type='application/json').json()['next']
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            stdout = StringIO()
+            call_command('archive_deleted', days = 30, batch_size = 1, output_dir = output_dir, stdout = stdout)
+
+            self.assertIn('reviews: 1, checkins: 1, places: 1, users: 1', stdout.getvalue())
+            self.assertFalse((Path(output_dir) / 'checkpoint.json').exists())
+
+            with gzip.open(next(Path(output_dir).glob('places-*.ndjson.gz'))) as archive:
+                self.assertEqual([json.loads(line)['id'] for line in archive], [2])
+
+        self.assertEqual(sorted(Review.all_objects.values_list('id', flat = True)), [2, 3])
+        self.assertEqual(sorted(CheckIn.all_objects.values_list('id', flat = True)), [2])
+        self.assertEqual(sorted(Place.all_objects.values_list('id', flat = True)), [1, 3])
+        self.assertEqual(sorted(User.all_objects.values_list('id', flat = True)), [1])
+
+        response = client.get('/place/changes', {'since': before}, content_type='application/json')
+        self.assertEqual(response.json(), {"message": "RESYNC_REQUIRED"})
+        self.assertEqual(response.status_code, 410)
+
+        response = client.get('/place/changes', {'since': latest}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
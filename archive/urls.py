@@ -1,11 +1,19 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import CheckInView, CheckInDeleteView, ReviewView, ReviewUpdateDeleteView
+from .views import (
+    CheckInView, AsyncCheckInView, CheckInBatchView, CheckInDeleteView, ReviewView, AsyncReviewView, ReviewSearchView, ReviewUpdateDeleteView
+)
+
+checkin_view = AsyncCheckInView if settings.ASYNC_VIEWS else CheckInView
+review_view  = AsyncReviewView if settings.ASYNC_VIEWS else ReviewView
 
 urlpatterns = [
-    path('/checkin/place/<int:place_pk>', CheckInView.as_view()),
+    path('/checkin/place/<int:place_pk>', checkin_view.as_view()),
+    path('/checkin/batch', CheckInBatchView.as_view()),
     path('/checkin/<int:checkin_pk>', CheckInDeleteView.as_view()),
-    path('/review/place/<int:place_pk>', ReviewView.as_view()),
+    path('/review/place/<int:place_pk>', review_view.as_view()),
+    path('/review/search', ReviewSearchView.as_view()),
     path('/review/<int:review_pk>', ReviewUpdateDeleteView.as_view())
 ]
 
@@ -1,139 +1,323 @@
 import json
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.views import View
+from django.views.decorators.http import condition
+from django.utils.decorators import method_decorator
 from django.utils import timezone
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
 
 from .models import CheckIn, Review
+from .cache import review_cache
+from .counters import add_checkins, add_reviews
+from .batch import sync_checkins
+from .search import search_review_ids
 from user.models import User
 from place.models import Place
+from place.trending import CHECKIN_WEIGHT, REVIEW_WEIGHT, record_event
 
 from user.utils import id_auth
+from theplaces.async_views import AsyncView, db_handler, run_db
+from theplaces.serialization import Projection, date_string, local_date_string, json_response
+from theplaces.utils import (
+    get_page_limit, encode_cursor, decode_cursor, decode_datetime, get_date_range,
+    make_etag, is_stream_request, stream_json_list
+)
+
+REVIEW_PROJECTION = Projection(
+    id         = 'id',
+    user       = 'user__nickname',
+    body       = 'body',
+    created_at = date_string('created_at'),
+)
+
+# 체크인 날짜는 하루 한 번 규칙, 기간 필터와 같은 현지 날짜(checkin_date)로 내려준다. (값이 없는 기존 행은 created_at의 현지 날짜)
+CHECKIN_PROJECTION = Projection(
+    id         = 'id',
+    created_at = Coalesce(date_string('checkin_date'), local_date_string('created_at')),
+)
+
+def get_review_body(request):
+    """요청 본문의 리뷰 내용 (문자열이 아니면 INVALID_BODY)"""
+    body = json.loads(request.body)['body']
+    if not isinstance(body, str):
+        raise ValueError("INVALID_BODY")
+    return body
+
+def get_review_version(request, place_pk):
+    """장소의 리뷰 버전 (places.review_version, 장소가 없거나 삭제되었으면 None)
+
+    ETag 계산과 페이지 캐시에서 함께 쓰므로 요청마다 한 번만 조회한다.
+    """
+    if not hasattr(request, 'review_version'):
+        request.review_version = review_cache.version(place_pk)
+    return request.review_version
+
+
+def review_list_etag(request, place_pk):
+    """리뷰 목록 페이지의 ETag (DB의 장소별 리뷰 버전으로 만든다)
+
+    장소가 없거나 삭제되었으면 None을 반환해 에러 응답에 ETag가 붙지 않게 한다.
+    """
+    if is_stream_request(request):
+        return None
+
+    try:
+        limit = get_page_limit(request)
+    except ValueError:
+        return None
+
+    version = get_review_version(request, place_pk)
+    if version is None:
+        return None
+    return make_etag(place_pk, version, request.GET.get('cursor'), limit)
 
 class CheckInView(View):
-    @id_auth
+    @id_auth(lazy = True)
     def post(self, request, place_pk):
         try:
-            user = request.user
-            place = Place.objects.get(id = place_pk)
-            today = timezone.now()
-
-            if CheckIn.objects.filter(user = user, place = place, deleted_at__isnull = True).exists():
-                recent_checkin = CheckIn.objects.filter(user = user, place = place, deleted_at__isnull = True).latest('created_at')
-                if today.strftime('%Y-%m-%d') == recent_checkin.created_at.strftime('%Y-%m-%d'):
-                    return JsonResponse({"message": "ALREADY_CHECKED_IN_TODAY"}, status = 401)
-            
-            CheckIn.objects.create(user = user, place = place)
+            user  = request.user
+            today = timezone.localdate()
+
+            if not Place.objects.filter(id = place_pk).exists():
+                raise Place.DoesNotExist
+
+            with transaction.atomic():
+                CheckIn.objects.create(user_id = user.id, place_id = place_pk, checkin_date = today)
+                add_checkins(place_pk, 1)
+                record_event(place_pk, CHECKIN_WEIGHT)
             return JsonResponse({"message": "CHECKED_IN"}, status = 201)
 
         except Place.DoesNotExist:
             return JsonResponse({"message": "INVALID_PLACE"}, status = 401)
+        except IntegrityError:
+            if CheckIn.objects.filter(user_id = user.id, place_id = place_pk, checkin_date = today).exists():
+                return JsonResponse({"message": "ALREADY_CHECKED_IN_TODAY"}, status = 401)
+            return JsonResponse({"message": "INVALID_USER"}, status = 400)
         
-    @id_auth
+    @id_auth(lazy = True)
     def get(self, request, place_pk):
-        user = request.user
-        checkins = CheckIn.objects.filter(user = user, place_id = place_pk, deleted_at__isnull = True)
+        """로그인 유저의 해당 장소 체크인 기록을 최신순으로 조회"""
+        try:
+            user             = request.user
+            limit            = get_page_limit(request)
+            cursor           = request.GET.get('cursor')
+            start_at, end_at = get_date_range(request)
+
+            checkins = CheckIn.objects.filter(user_id = user.id, place_id = place_pk).order_by('-created_at', '-id')
 
-        result = [
-                    {
-                        "id": checkin.id,
-                        "created_at": checkin.created_at.strftime('%Y-%m-%d')
-                    } for checkin in checkins
-                ]
-        return JsonResponse({"result": result}, status = 200)
+            if start_at:
+                checkins = checkins.filter(created_at__gte = start_at)
+            if end_at:
+                checkins = checkins.filter(created_at__lt = end_at)
+            if cursor:
+                created_at, last_id = decode_cursor(cursor, (str, int))
+                created_at          = decode_datetime(created_at)
+                checkins            = checkins.filter(Q(created_at__lt = created_at) | Q(created_at = created_at, id__lt = last_id))
+
+            rows        = list(CHECKIN_PROJECTION.values(checkins, 'created_at', 'id')[:limit + 1])
+            next_cursor = encode_cursor(rows[limit - 1][-2].isoformat(), rows[limit - 1][-1]) if len(rows) > limit else None
+
+            return json_response({"result": CHECKIN_PROJECTION.serialize(rows[:limit]), "next": next_cursor}, status = 200)
+
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+
+
+class AsyncCheckInView(AsyncView):
+    """CheckInView의 비동기 버전 (ASGI)"""
+    post = id_auth(db_handler(CheckInView.post), lazy = True)
+    get  = id_auth(db_handler(CheckInView.get), lazy = True)
+
+
+class CheckInBatchView(View):
+    @id_auth(lazy = True)
+    def post(self, request):
+        """오프라인에서 쌓인 체크인 일괄 반영 (항목별 결과 반환)"""
+        try:
+            data = json.loads(request.body)
+            assert isinstance(data, dict), "INVALID_BATCH"
+
+            items = data['checkins']
+            assert isinstance(items, list) and 0 < len(items) <= settings.CHECKIN_BATCH_MAX, "INVALID_BATCH"
+
+            result = sync_checkins(request.user.id, items)
+            return json_response({"message": "CHECKINS_SYNCED", "result": result}, status = 200)
+
+        except json.JSONDecodeError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+        except KeyError:
+            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+        except AssertionError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+        except IntegrityError:
+            return JsonResponse({"message": "INVALID_USER"}, status = 400)
 
 
 class CheckInDeleteView(View):
-    @id_auth
+    @id_auth(lazy = True)
     def delete(self, request, checkin_pk):
         try:
             user = request.user
-            delete_object = CheckIn.objects.get(id = checkin_pk, deleted_at__isnull = True)
 
-            if delete_object.user == user:
+            with transaction.atomic():
+                delete_object = CheckIn.objects.select_for_update().get(id = checkin_pk)
+
+                if delete_object.user_id != user.id:
+                    return JsonResponse({"message": "UNAUTHORIZED"}, status = 401)
+
                 delete_object.deleted_at = timezone.now()
                 delete_object.save()
-                return JsonResponse({"message": "CHECK_IN_DELETED"}, status = 204)
-            else:
-                return JsonResponse({"message": "UNAUTHORIZED"}, status = 401)
+                add_checkins(delete_object.place_id, -1)
+            return JsonResponse({"message": "CHECK_IN_DELETED"}, status = 204)
 
         except CheckIn.DoesNotExist:
             return JsonResponse({"message": "INVALID_CHECKIN"}, status = 400)
 
 class ReviewView(View):
-    @id_auth
+    # 목록 페이지를 review_cache에 담으므로, 지연된 replica 내용이 캐시에 남지 않도록 primary에서 읽는다
+    read_replica = False
+
+    @id_auth(lazy = True)
     def post(self, request, place_pk):
         """해당 장소에 대한 리뷰 작성"""
         try:
             user = request.user
             place = Place.objects.get(id = place_pk)
-            body = json.loads(request.body)['body']
+            body = get_review_body(request)
 
-            Review.objects.create(user = user, place= place, body = body)
+            with transaction.atomic():
+                Review.objects.create(user_id = user.id, place = place, body = body)
+                add_reviews(place.id, 1)
+                record_event(place.id, REVIEW_WEIGHT)
             return JsonResponse({"message": "REVIEW_CREATED"}, status = 201)
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
         except KeyError:
             return JsonResponse({"message": "KEY_ERROR"}, status = 400)
         except Place.DoesNotExist:
             return JsonResponse({"message": "INVALID_PLACE"}, status = 400)
 
+    @method_decorator(condition(etag_func = review_list_etag))
     def get(self, request, place_pk):
         """해당 장소에 대한 로그인 유저의 리뷰 조회"""
         try:
-            place = Place.objects.get(id = place_pk)
-            
-            reviews = Review.objects.select_related('user').filter(place = place, deleted_at__isnull = True)
-
-            result = [
-                        {
-                            "id": review.id,
-                            "user": review.user.nickname, 
-                            "body": review.body,
-                            "created_at": review.created_at.strftime('%Y-%m-%d')
-                        } for review in reviews
-                    ]
-
-            return JsonResponse({"result": result}, status = 200)
+            if is_stream_request(request):
+                if not Place.objects.filter(id = place_pk).exists():
+                    raise Place.DoesNotExist
+
+                reviews = Review.objects.filter(place_id = place_pk).order_by('id')
+                return stream_json_list(REVIEW_PROJECTION.values(reviews), REVIEW_PROJECTION.to_dict)
+
+            limit  = get_page_limit(request)
+            cursor = request.GET.get('cursor')
+            if cursor:
+                last_id, = decode_cursor(cursor, (int,))
+
+            version = get_review_version(request, place_pk)
+            if version is None:
+                raise Place.DoesNotExist
+
+            def build_page():
+                reviews = Review.objects.filter(place_id = place_pk).order_by('id')
+
+                if cursor:
+                    reviews = reviews.filter(id__gt = last_id)
+
+                rows        = list(REVIEW_PROJECTION.values(reviews, 'id')[:limit + 1])
+                next_cursor = encode_cursor(rows[limit - 1][-1]) if len(rows) > limit else None
+
+                return {"result": REVIEW_PROJECTION.serialize(rows[:limit]), "next": next_cursor}
+
+            return json_response(review_cache.get_page(place_pk, version, cursor, limit, build_page), status = 200)
+
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
         except Place.DoesNotExist:
             return JsonResponse({"message": "INVALID_PLACE"}, status = 400)
 
+class AsyncReviewView(AsyncView):
+    """ReviewView의 비동기 버전 (ASGI)
+
+    Django 3.1의 ASGI 핸들러는 스트리밍 응답을 이벤트 루프에서 읽으므로 stream 요청은 지원하지 않는다.
+    """
+    read_replica = ReviewView.read_replica
+
+    post = id_auth(db_handler(ReviewView.post), lazy = True)
+
+    async def get(self, request, place_pk):
+        if is_stream_request(request):
+            return JsonResponse({"message": "STREAM_NOT_SUPPORTED"}, status = 400)
+        return await run_db(ReviewView.get, self, request, place_pk)
+
 class ReviewUpdateDeleteView(View):
-    @id_auth
+    @id_auth(lazy = True)
     def patch(self, request, review_pk):
         try:
             user   = request.user
-            review = Review.objects.get(id = review_pk, deleted_at__isnull = True)
-            body   = json.loads(request.body)['body']
+            review = Review.objects.get(id = review_pk)
+            body   = get_review_body(request)
 
-            if review.user == user:
+            if review.user_id == user.id:
                 review.body = body
                 review.save()
                 return JsonResponse({"message": "REVIEW_UPDATED"}, status = 200)
             else:
                 return JsonResponse({"message": "UNAUTHORIZAED"}, status = 401)
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
         except KeyError:
             return JsonResponse({"message": "KEY_ERROR"}, status = 400)
         except Review.DoesNotExist:
             return JsonResponse({"message": "INVALID_REVIEW"}, status = 400)
 
-    @id_auth
+    @id_auth(lazy = True)
     def delete(self, request, review_pk):
         try:
-            user   = request.user
-            review = Review.objects.get(id = review_pk, deleted_at__isnull = True)
-            
-            if review.user == user:
+            user = request.user
+
+            with transaction.atomic():
+                review = Review.objects.select_for_update().get(id = review_pk)
+
+                if review.user_id != user.id:
+                    return JsonResponse({"message": "UNAUTHORIZED"}, status = 401)
+
                 review.deleted_at = timezone.now()
                 review.save()
-                return JsonResponse({"message": "REVIEW_DELETED"}, status = 204)
-            else:
-                return JsonResponse({"message": "UNAUTHORIZED"}, status = 401)
+                add_reviews(review.place_id, -1)
+            return JsonResponse({"message": "REVIEW_DELETED"}, status = 204)
         
         except Review.DoesNotExist:
             return JsonResponse({"message": "INVALID_REVIEW"}, status = 400)
+
+
+class ReviewSearchView(View):
+    def get(self, request):
+        """리뷰 본문 검색 (관련도순, place_id로 장소 범위 지정)"""
+        try:
+            query    = request.GET['q']
+            place_id = request.GET.get('place_id')
+            if place_id and not place_id.isdigit():
+                raise ValueError("INVALID_PLACE")
+            place_id = int(place_id) if place_id else None
+            limit    = get_page_limit(request)
+            cursor   = request.GET.get('cursor')
+            offset,  = decode_cursor(cursor, (int,)) if cursor else (0,)
+
+            review_ids = search_review_ids(query, place_id, limit + 1, offset)
+            rows       = REVIEW_PROJECTION.values(Review.objects.filter(id__in = review_ids[:limit]), 'place_id', 'id')
+            reviews    = {row[-1]: {**REVIEW_PROJECTION.to_dict(row), "place_id": row[-2]} for row in rows}
+
+            result      = [reviews[review_id] for review_id in review_ids[:limit] if review_id in reviews]
+            next_cursor = encode_cursor(offset + limit) if len(review_ids) > limit else None
+            return json_response({"result": result, "next": next_cursor}, status = 200)
+
+        except KeyError:
+            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
@@ -0,0 +1,26 @@
+import re
+import unicodedata
+
+REGEX_ROAD_ADDRESS = '(([가-힣A-Za-z·\d~\-\.]{2,}(로|길).[\d]+)|([가-힣A-Za-z·\d~\-\.]+(읍|동)\s)[\d]+)'
+
+REGEX_DASH           = re.compile(r'[‐-―−﹘﹣]')
+REGEX_NUMBER_DASH    = re.compile(r'(?<=\d)\s*-\s*(?=\d)')
+REGEX_NUMBER_GAP     = re.compile(r'(?<=\d)[^\w-]+(?=\d)')
+REGEX_NON_WORD       = re.compile(r'[^\w/-]|_')
+REGEX_STRAY_DASH     = re.compile(r'(?<!\d)-|-(?!\d)')
+REGEX_LEADING_ZEROES = re.compile(r'(?<!\d)0+(?=\d)')
+
+
+def canonicalize_address(road_address):
+    """중복 장소 판별용 주소 키
+
+    유니코드 정규화(NFKC) 후 건물번호 사이의 여러 대시를 '-'로 통일하고, 떨어진 숫자 사이는 '/'로 구분하며,
+    그 외 공백과 문장부호, 번호 앞의 0을 제거한다. (예: '테헤란로  1', '테헤란로1' → '테헤란로1', '중앙동 1 – 03' → '중앙동1-3')
+    """
+    text = unicodedata.normalize('NFKC', road_address).lower()
+    text = REGEX_DASH.sub('-', text)
+    text = REGEX_NUMBER_DASH.sub('-', text)
+    text = REGEX_NUMBER_GAP.sub('/', text)
+    text = REGEX_NON_WORD.sub('', text)
+    text = REGEX_STRAY_DASH.sub('', text)
+    return REGEX_LEADING_ZEROES.sub('', text)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PlaceConfig(AppConfig):
     name = 'place'
+
+    def ready(self):
+        from . import signals
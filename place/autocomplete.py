@@ -0,0 +1,212 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from .models import LocalRegion, Place
+
+CHOSEONG     = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+CHOSEONG_SET = frozenset(CHOSEONG)
+
+
+def normalize(text):
+    """검색 키: 공백 제거 후 소문자"""
+    return ''.join(text.split()).lower()
+
+
+def to_choseong(text):
+    """완성형 한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    return ''.join(
+        CHOSEONG[(ord(char) - 0xAC00) // 588] if '가' <= char <= '힣' else char
+        for char in text
+    )
+
+
+def matches_mixed(name_key, query):
+    """음절과 초성이 섞인 검색어가 이름 앞부분과 일치하는지 확인 (예: '스ㅌ' → '스타벅스')"""
+    return all(
+        to_choseong(name_char) == query_char if query_char in CHOSEONG_SET else name_char == query_char
+        for name_char, query_char in zip(name_key, query)
+    )
+
+
+class _Snapshot:
+    """전체(None) 및 광역 지역 id별 정렬된 (키, 장소 id) 배열"""
+    def __init__(self):
+        self.places    = {}
+        self.names     = {}
+        self.choseongs = {}
+
+    def add(self, place_id, name, metro_region_id):
+        self.places[place_id] = (name, metro_region_id)
+        key = normalize(name)
+        for scope in {None, metro_region_id}:
+            insort(self.names.setdefault(scope, []), (key, place_id))
+            insort(self.choseongs.setdefault(scope, []), (to_choseong(key), place_id))
+
+    def remove(self, place_id):
+        if place_id not in self.places:
+            return
+
+        name, metro_region_id = self.places.pop(place_id)
+        key = normalize(name)
+        for scope in {None, metro_region_id}:
+            for entries, entry in ((self.names[scope], (key, place_id)), (self.choseongs[scope], (to_choseong(key), place_id))):
+                index = bisect_left(entries, entry)
+                if index < len(entries) and entries[index] == entry:
+                    del entries[index]
+
+    def add_many(self, places):
+        """(장소 id, 이름, 광역 지역 id) 목록을 한 번에 추가 (이미 있는 id는 건너뜀)
+
+        새 항목을 정렬해 기존 배열과 합친 새 배열로 교체하므로, 행마다 insort하는 것보다 빠르고
+        교체 전까지 검색은 기존 배열을 그대로 읽는다.
+        """
+        names     = {}
+        choseongs = {}
+        for place_id, name, metro_region_id in places:
+            if place_id in self.places:
+                continue
+            self.places[place_id] = (name, metro_region_id)
+            key = normalize(name)
+            for scope in {None, metro_region_id}:
+                names.setdefault(scope, []).append((key, place_id))
+                choseongs.setdefault(scope, []).append((to_choseong(key), place_id))
+
+        for index, entries in ((self.names, names), (self.choseongs, choseongs)):
+            for scope, new_entries in entries.items():
+                index[scope] = sorted(index.get(scope, []) + new_entries)
+
+
+class PlaceNameIndex:
+    """살아있는 장소 이름 자동완성 인덱스 (프로세스 단위)
+
+    이름과 이름의 초성 문자열을 정렬된 배열로 보관하고 이진 탐색으로 접두어 범위를 찾는다.
+    장소 저장/삭제, 일괄 등록 시 증분 반영하며, 다른 프로세스의 변경은 PLACE_AUTOCOMPLETE_TTL마다 다시 읽어 반영한다.
+    다시 읽기는 백그라운드 스레드에서 실행하고, 그동안 검색은 이전 인덱스를 사용한다.
+    인덱스가 아직 없는 첫 검색만 직접 만들 때까지 기다린다.
+    """
+    def __init__(self):
+        self._lock           = threading.Lock()
+        self._build_lock     = threading.Lock()
+        self._snapshot       = None
+        self._expires_at     = 0
+        self._pending        = None
+        self._refresh_thread = None
+
+    def _build(self):
+        snapshot     = _Snapshot()
+        local_metros = dict(LocalRegion.objects.values_list('id', 'metro_region_id'))
+        names        = {}
+        choseongs    = {}
+
+        places = Place.objects.values_list('id', 'name', 'region_id')
+        for place_id, name, region_id in places.iterator(chunk_size = 2000):
+            metro_region_id           = local_metros.get(region_id)
+            key                       = normalize(name)
+            snapshot.places[place_id] = (name, metro_region_id)
+            for scope in {None, metro_region_id}:
+                names.setdefault(scope, []).append((key, place_id))
+                choseongs.setdefault(scope, []).append((to_choseong(key), place_id))
+
+        snapshot.names     = {scope: sorted(entries) for scope, entries in names.items()}
+        snapshot.choseongs = {scope: sorted(entries) for scope, entries in choseongs.items()}
+        return snapshot
+
+    def _refresh(self):
+        """인덱스를 DB에서 다시 만들고, 만드는 동안 들어온 증분 변경을 반영해 교체 (_pending이 설정된 상태에서 호출)"""
+        try:
+            new_snapshot = self._build()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for method, args in self._pending or ():
+                getattr(new_snapshot, method)(*args)
+            self._snapshot   = new_snapshot
+            self._expires_at = time.monotonic() + settings.PLACE_AUTOCOMPLETE_TTL
+            self._pending    = None
+            return new_snapshot
+
+    def _refresh_in_background(self):
+        try:
+            self._refresh()
+        finally:
+            connection.close()
+
+    def _get_snapshot(self):
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                if time.monotonic() >= self._expires_at and self._pending is None:
+                    self._pending        = []
+                    self._refresh_thread = threading.Thread(target = self._refresh_in_background, name = 'place-autocomplete', daemon = True)
+                    self._refresh_thread.start()
+                return snapshot
+
+        with self._build_lock:
+            with self._lock:
+                if self._snapshot is not None:
+                    return self._snapshot
+                self._pending = []
+            return self._refresh()
+
+    def _apply(self, method, *args):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((method, args))
+            if self._snapshot is not None:
+                getattr(self._snapshot, method)(*args)
+
+    def upsert(self, place_id, name, metro_region_id):
+        self._apply('remove', place_id)
+        self._apply('add', place_id, name, metro_region_id)
+
+    def remove(self, place_id):
+        self._apply('remove', place_id)
+
+    def add_many(self, places):
+        """일괄 등록된 (장소 id, 이름, 광역 지역 id) 목록 반영"""
+        self._apply('add_many', list(places))
+
+    def invalidate(self):
+        """다음 검색 때 백그라운드에서 인덱스를 처음부터 다시 읽도록 만료 처리"""
+        with self._lock:
+            self._expires_at = 0
+
+    def clear(self):
+        """인덱스를 버려 다음 검색이 직접 다시 만들도록 함"""
+        with self._lock:
+            self._snapshot = None
+
+    def search(self, query, metro_region_id = None, limit = 10):
+        """이름 접두어 또는 초성(음절 혼합 가능)으로 장소 검색"""
+        query = normalize(query)
+        if not query:
+            return []
+
+        snapshot = self._get_snapshot()
+        if CHOSEONG_SET.intersection(query):
+            entries, prefix, mixed = snapshot.choseongs.get(metro_region_id, []), to_choseong(query), True
+        else:
+            entries, prefix, mixed = snapshot.names.get(metro_region_id, []), query, False
+
+        result = []
+        index  = bisect_left(entries, (prefix,))
+        while index < len(entries) and len(result) < limit:
+            key, place_id = entries[index]
+            if not key.startswith(prefix):
+                break
+
+            index += 1
+            place  = snapshot.places.get(place_id)
+            if place and (not mixed or matches_mixed(normalize(place[0]), query)):
+                result.append({"id": place_id, "name": place[0]})
+        return result
+
+
+place_name_index = PlaceNameIndex()
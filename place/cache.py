@@ -0,0 +1,116 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .models import MetroRegion, LocalRegion, PlaceType
+
+
+class LookupCache:
+    """광역 지역, 지역, 장소 유형의 이름 → id 조회 캐시 (프로세스 단위)
+
+    세 참조 테이블을 한 번에 읽어 스냅샷으로 보관하며,
+    PLACE_LOOKUP_CACHE_TTL이 지나거나 참조 테이블이 변경되면 다시 읽는다.
+    다른 프로세스에서 추가된 값은 이 프로세스의 캐시를 무효화하지 않으므로, 조회에 없는 이름이 있으면
+    PLACE_LOOKUP_MISS_RELOAD_INTERVAL에 한 번까지 다시 읽어 확인한 뒤 없다고 판단한다.
+    """
+    def __init__(self):
+        self._lock          = threading.Lock()
+        self._snapshot      = None
+        self._expires_at    = 0
+        self._miss_reloaded = None
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot   = None
+            self._expires_at = 0
+
+    def _load(self):
+        metro_regions = dict(MetroRegion.objects.values_list('name', 'id'))
+        place_types   = dict(PlaceType.objects.values_list('name', 'id'))
+        local_regions = {}
+        local_metros  = {}
+        metro_locals  = {}
+        name_locals   = {}
+
+        for local_id, name, metro_id in LocalRegion.objects.values_list('id', 'name', 'metro_region_id'):
+            local_regions[(metro_id, name)] = local_id
+            local_metros[local_id]          = metro_id
+            metro_locals.setdefault(metro_id, []).append(local_id)
+            name_locals.setdefault(name, []).append(local_id)
+
+        return {
+            'metro_regions' : metro_regions,
+            'local_regions' : local_regions,
+            'local_metros'  : local_metros,
+            'metro_locals'  : metro_locals,
+            'name_locals'   : name_locals,
+            'place_types'   : place_types,
+        }
+
+    def _get_snapshot(self):
+        with self._lock:
+            if self._snapshot is None or time.monotonic() >= self._expires_at:
+                self._snapshot   = self._load()
+                self._expires_at = time.monotonic() + settings.PLACE_LOOKUP_CACHE_TTL
+            return self._snapshot
+
+    def _reload_on_miss(self):
+        """조회에 없는 값이 있을 때 스냅샷을 다시 읽음 (PLACE_LOOKUP_MISS_RELOAD_INTERVAL에 한 번까지)"""
+        with self._lock:
+            now = time.monotonic()
+            if self._miss_reloaded is not None and now < self._miss_reloaded + settings.PLACE_LOOKUP_MISS_RELOAD_INTERVAL:
+                return False
+            self._miss_reloaded = now
+            self._snapshot      = None
+        return True
+
+    def _lookup(self, section, key, exception):
+        value = self._get_snapshot()[section].get(key)
+        if value is None and self._reload_on_miss():
+            value = self._get_snapshot()[section].get(key)
+        if value is None:
+            raise exception
+        return value
+
+    def _lookup_many(self, section, keys):
+        """keys 중 스냅샷에 있는 값 목록 (없는 키가 있으면 한 번 다시 읽어 확인)"""
+        values = self._get_snapshot()[section]
+        if any(key not in values for key in keys) and self._reload_on_miss():
+            values = self._get_snapshot()[section]
+        return [values[key] for key in keys if key in values]
+
+    def metro_region_id(self, name):
+        return self._lookup('metro_regions', name, MetroRegion.DoesNotExist)
+
+    def local_region_id(self, metro_region_id, name):
+        return self._lookup('local_regions', (metro_region_id, name), LocalRegion.DoesNotExist)
+
+    def metro_region_id_of(self, local_region_id):
+        """지역 id가 속한 광역 지역 id"""
+        return self._lookup('local_metros', local_region_id, LocalRegion.DoesNotExist)
+
+    def place_type_id(self, name):
+        return self._lookup('place_types', name, PlaceType.DoesNotExist)
+
+    def metro_region_ids(self, names):
+        """이름 목록에 해당하는 광역 지역 id 목록 (없는 이름은 무시)"""
+        return self._lookup_many('metro_regions', names)
+
+    def local_region_ids(self, names = None, metro_region_ids = None):
+        """지역 이름 또는 광역 지역 id에 속하는 지역 id 목록 (둘 다 주어지면 교집합)"""
+        result = None
+
+        if names is not None:
+            result = {local_id for local_ids in self._lookup_many('name_locals', names) for local_id in local_ids}
+        if metro_region_ids is not None:
+            in_metro = {local_id for local_ids in self._lookup_many('metro_locals', metro_region_ids) for local_id in local_ids}
+            result   = in_metro if result is None else result & in_metro
+        return sorted(result or [])
+
+    def place_type_ids(self, names):
+        """이름 목록에 해당하는 장소 유형 id 목록 (없는 이름은 무시)"""
+        return self._lookup_many('place_types', names)
+
+
+lookup_cache = LookupCache()
@@ -0,0 +1,110 @@
+import math
+
+GEOHASH_BASE32     = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION  = 9
+GEOHASH_UPPER      = '{'
+GEOHASH_MAX_CELLS  = 32
+EARTH_RADIUS_METER = 6371000
+METER_PER_DEGREE   = 111320
+
+
+def parse_coordinates(latitude, longitude):
+    """위도, 경도 값을 검증 후 float로 변환 (둘 다 없으면 (None, None))"""
+    if latitude is None and longitude is None:
+        return None, None
+
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError("INVALID_COORDINATES")
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("INVALID_COORDINATES")
+    return latitude, longitude
+
+
+def encode_geohash(latitude, longitude, precision = GEOHASH_PRECISION):
+    """위도, 경도를 geohash 문자열로 변환 (경도부터 번갈아 1비트씩)"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash   = []
+    bits      = 0
+    bit_count = 0
+    is_lng    = True
+
+    while len(geohash) < precision:
+        value, value_range = (longitude, lng_range) if is_lng else (latitude, lat_range)
+        middle             = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits           = bits * 2 + 1
+            value_range[0] = middle
+        else:
+            bits           = bits * 2
+            value_range[1] = middle
+
+        is_lng     = not is_lng
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits      = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    """geohash 칸 하나의 (위도, 경도) 크기 (도)"""
+    lat_bits = precision * 5 // 2
+    lng_bits = precision * 5 - lat_bits
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius):
+    """반경 radius(m) 원을 감싸는 (최소 위도, 최대 위도, 최소 경도, 최대 경도)
+
+    경도 폭은 원에서 극에 가까운 쪽 위도 기준으로 넉넉하게 잡으며, ±180을 넘는 값은 그대로 둔다. (날짜변경선 처리는 호출하는 쪽에서)
+    """
+    lat_delta = radius / METER_PER_DEGREE
+    lat_min   = max(latitude - lat_delta, -90)
+    lat_max   = min(latitude + lat_delta, 90)
+    lng_meter = METER_PER_DEGREE * max(math.cos(math.radians(max(abs(lat_min), abs(lat_max)))), 0.01)
+    lng_delta = min(radius / lng_meter, 180)
+    return lat_min, lat_max, longitude - lng_delta, longitude + lng_delta
+
+
+def cell_span(value_min, value_max, origin, size):
+    """[value_min, value_max] 구간이 걸치는 칸 번호 범위 (origin부터 size 간격)"""
+    return range(math.floor((value_min - origin) / size), math.floor((value_max - origin) / size) + 1)
+
+
+def search_cells(latitude, longitude, radius):
+    """반경 radius(m) 원의 바운딩 박스를 덮는 geohash 접두어 집합
+
+    칸 수가 GEOHASH_MAX_CELLS 이하인 가장 긴 geohash를 사용하므로, 조회 범위가 원 넓이의 몇 배로 커지지 않는다.
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(latitude, longitude, radius)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lng_size = cell_size(precision)
+        rows               = cell_span(lat_min, lat_max, -90, lat_size)
+        columns            = cell_span(lng_min, lng_max, -180, lng_size)
+        if len(rows) * len(columns) <= GEOHASH_MAX_CELLS:
+            break
+
+    cells = set()
+    for row in rows:
+        cell_latitude = -90 + (row + 0.5) * lat_size
+        if cell_latitude > 90:
+            continue
+        for column in columns:
+            cell_longitude = (-180 + (column + 0.5) * lng_size + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return cells
+
+
+def haversine(latitude_1, longitude_1, latitude_2, longitude_2):
+    """두 좌표 사이의 대원 거리 (m)"""
+    lat_1, lat_2 = math.radians(latitude_1), math.radians(latitude_2)
+    delta_lat    = lat_2 - lat_1
+    delta_lng    = math.radians(longitude_2 - longitude_1)
+    a            = math.sin(delta_lat / 2) ** 2 + math.cos(lat_1) * math.cos(lat_2) * math.sin(delta_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_METER * math.asin(min(1.0, math.sqrt(a)))
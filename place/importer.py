@@ -0,0 +1,171 @@
+import codecs
+import csv
+import json
+import re
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from .models import MetroRegion, LocalRegion, PlaceType, Place, ChangeSequence
+from .autocomplete import place_name_index
+from .cache import lookup_cache
+from .address import REGEX_ROAD_ADDRESS, canonicalize_address
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_FIELDS     = ('place_type', 'metro_region', 'local_region', 'road_address', 'name')
+
+# 디코딩할 수 없는 바이트를 대신하는 문자
+REPLACEMENT_CHARACTER = '\ufffd'
+
+
+def read_csv(lines):
+    """헤더가 있는 CSV 줄 목록을 행 dict로 변환"""
+    return csv.DictReader(lines)
+
+
+def read_ndjson(lines):
+    """NDJSON 줄 목록을 행 dict로 변환 (잘못된 줄은 None)"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def read_rows(stream, file_format):
+    """바이트 줄 스트림을 형식(csv, ndjson)에 맞게 행 dict로 변환
+
+    UTF-8로 디코딩할 수 없는 바이트는 U+FFFD로 바꾸어 읽고, 해당 행은 resolve_row에서 INVALID_ENCODING으로 거른다.
+    (중간에 예외로 중단되면 이미 등록된 배치의 결과를 보고할 수 없으므로 행 단위로 처리한다)
+    """
+    lines = codecs.iterdecode(stream, 'utf-8-sig', errors = 'replace')
+
+    if file_format == 'csv':
+        return read_csv(lines)
+    if file_format == 'ndjson':
+        return read_ndjson(lines)
+    raise ValueError("INVALID_FORMAT")
+
+
+def resolve_row(row):
+    """행을 검증하고 Place 생성 인자로 변환, 실패 시 에러 메시지 반환"""
+    if not isinstance(row, dict):
+        return None, "INVALID_ROW"
+    if any(not row.get(field) for field in IMPORT_FIELDS):
+        return None, "KEY_ERROR"
+    if any(not isinstance(row[field], str) for field in IMPORT_FIELDS):
+        return None, "INVALID_ROW"
+    if any(REPLACEMENT_CHARACTER in row[field] for field in IMPORT_FIELDS):
+        return None, "INVALID_ENCODING"
+    if not re.match(REGEX_ROAD_ADDRESS, row['road_address']):
+        return None, "INVALID_ROAD_ADDRESS_FORMAT"
+
+    try:
+        place_type_id   = lookup_cache.place_type_id(row['place_type'])
+        metro_region_id = lookup_cache.metro_region_id(row['metro_region'])
+        local_region_id = lookup_cache.local_region_id(metro_region_id, row['local_region'])
+    except PlaceType.DoesNotExist:
+        return None, "INVALID_PLACE_TYPE"
+    except (MetroRegion.DoesNotExist, LocalRegion.DoesNotExist):
+        return None, "INVALID_REGION"
+
+    return {
+        'name'          : row['name'],
+        'place_type_id' : place_type_id,
+        'region_id'     : local_region_id,
+        'road_address'  : row['road_address'],
+        'address_key'   : canonicalize_address(row['road_address']),
+    }, None
+
+
+def place_key(values):
+    """중복 판별 키 (정규화된 주소 기준, bulk_create는 save()를 거치지 않으므로 주소 키를 직접 채운다)"""
+    return (values['name'], values['place_type_id'], values['region_id'], values['address_key'])
+
+
+def insert_each(pending, errors):
+    """동시에 등록된 장소와 충돌한 배치를 한 행씩 다시 저장"""
+    created = 0
+    for row_number, place in pending:
+        try:
+            with transaction.atomic():
+                place.save(force_insert = True)
+            created += 1
+        except IntegrityError:
+            errors.append({"row": row_number, "message": "EXIST_PLACE"})
+    return created
+
+
+def index_created(first_seq, last_seq):
+    """bulk_create로 등록된 장소(변경 번호 범위)를 자동완성 인덱스에 반영 (bulk_create는 post_save를 보내지 않는다)"""
+    places = Place.objects.filter(change_seq__gte = first_seq, change_seq__lte = last_seq).values_list('id', 'name', 'region_id')
+    place_name_index.add_many((place_id, name, lookup_cache.metro_region_id_of(region_id)) for place_id, name, region_id in places)
+
+
+def import_batch(batch):
+    """(행 번호, 행) 목록 하나를 검증, 중복 제거 후 한 트랜잭션으로 저장"""
+    errors   = []
+    resolved = []
+
+    for row_number, row in batch:
+        values, error = resolve_row(row)
+        if error:
+            errors.append({"row": row_number, "message": error})
+        else:
+            resolved.append((row_number, values))
+
+    pending = []
+    with transaction.atomic():
+        existing = set(
+            Place.objects.filter(name__in = {values['name'] for _, values in resolved})
+                .values_list('name', 'place_type_id', 'region_id', 'address_key')
+        ) if resolved else set()
+
+        for row_number, values in resolved:
+            key = place_key(values)
+            if key in existing:
+                errors.append({"row": row_number, "message": "EXIST_PLACE"})
+                continue
+            existing.add(key)
+            pending.append((row_number, Place(**values)))
+
+        if pending:
+            last_seq = ChangeSequence.allocate(Place.CHANGE_SEQUENCE, len(pending))
+            for change_seq, (_, place) in enumerate(pending, start = last_seq - len(pending) + 1):
+                place.change_seq = change_seq
+
+        try:
+            with transaction.atomic():
+                Place.objects.bulk_create([place for _, place in pending], batch_size = IMPORT_BATCH_SIZE)
+            created = len(pending)
+        except IntegrityError:
+            created = insert_each(pending, errors)
+            pending = []    # save()로 저장된 장소는 post_save에서 자동완성 인덱스에 반영된다
+
+    if pending:
+        index_created(last_seq - len(pending) + 1, last_seq)
+
+    errors.sort(key = lambda error: error['row'])
+    return created, errors
+
+
+def import_places(rows, batch_size = IMPORT_BATCH_SIZE):
+    """행 dict 이터러블을 batch_size 단위로 나누어 장소를 일괄 등록
+
+    반환값: {"created": 등록 수, "errors": [{"row": 행 번호, "message": 에러}, ...]}
+    """
+    numbered = enumerate(rows, start = 1)
+    created  = 0
+    errors   = []
+
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            break
+        batch_created, batch_errors = import_batch(batch)
+        created += batch_created
+        errors.extend(batch_errors)
+
+    return {"created": created, "errors": errors}
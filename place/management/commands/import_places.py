@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from place.importer import IMPORT_BATCH_SIZE, read_rows, import_places
+
+
+class Command(BaseCommand):
+    help = 'CSV 또는 NDJSON 파일로 장소를 일괄 등록합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help = '가져올 파일 경로')
+        parser.add_argument('--format', choices = ['csv', 'ndjson'], help = '파일 형식 (기본값: 확장자로 판단)')
+        parser.add_argument('--batch-size', type = int, default = IMPORT_BATCH_SIZE, help = '트랜잭션 하나에 등록할 행 수')
+
+    def handle(self, *args, **options):
+        path        = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            with open(path, 'rb') as stream:
+                report = import_places(read_rows(stream, file_format), batch_size = options['batch_size'])
+        except OSError as e:
+            raise CommandError(e)
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {error['message']}")
+        self.stdout.write(self.style.SUCCESS(f"created: {report['created']}, failed: {len(report['errors'])}"))
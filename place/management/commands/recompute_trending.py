@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from archive.models import CheckIn, Review
+from place.models import Place, PlaceTrend
+from place.trending import CHECKIN_WEIGHT, REVIEW_WEIGHT, event_score, add_scores
+
+RECOMPUTE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = '최근 체크인, 리뷰 기록으로 장소 인기도 점수를 처음부터 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-days', type = int, default = 30, help = '점수 계산에 포함할 최근 기간 (일)')
+
+    def handle(self, *args, **options):
+        if options['window_days'] < 1:
+            raise CommandError('--window-days must be positive')
+
+        since  = timezone.now() - timedelta(days = options['window_days'])
+        scores = {}
+
+        for model, weight in ((CheckIn, CHECKIN_WEIGHT), (Review, REVIEW_WEIGHT)):
+            events = model.objects.filter(created_at__gte = since).values_list('place_id', 'created_at')
+            for place_id, created_at in events.iterator(chunk_size = RECOMPUTE_BATCH_SIZE):
+                scores[place_id] = add_scores(scores.get(place_id), event_score(weight, created_at))
+
+        trends    = []
+        place_ids = sorted(scores)
+        for start in range(0, len(place_ids), RECOMPUTE_BATCH_SIZE):
+            places = Place.objects.filter(id__in = place_ids[start:start + RECOMPUTE_BATCH_SIZE])
+            trends.extend(
+                PlaceTrend(place_id = place_id, metro_region_id = metro_region_id, place_type_id = place_type_id, score = scores[place_id])
+                for place_id, metro_region_id, place_type_id in places.values_list('id', 'region__metro_region_id', 'place_type_id')
+            )
+
+        with transaction.atomic():
+            PlaceTrend.objects.all().delete()
+            PlaceTrend.objects.bulk_create(trends, batch_size = RECOMPUTE_BATCH_SIZE)
+
+        self.stdout.write(self.style.SUCCESS(f"recomputed trending scores for {len(trends)} places"))
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['region', 'place_type', 'deleted_at'], name='places_region_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['place_type', 'deleted_at'], name='places_type_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:54
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def soft_delete_live_duplicates(apps, schema_editor):
+    """고유 제약을 만들기 전에 기존 살아있는 중복 장소 정리
+
+    이름, 유형, 지역, 주소가 같은 살아있는 장소가 여러 개면 먼저 등록된 장소만 남기고
+    나머지는 소프트 삭제한다. (체크인, 리뷰 등 연결된 기록은 그대로 둔다)
+    """
+    Place      = apps.get_model('place', 'Place')
+    seen       = set()
+    duplicates = []
+
+    places = Place.objects.filter(deleted_at__isnull = True).order_by('id').values_list('id', 'name', 'place_type_id', 'region_id', 'road_address')
+    for place_id, *key in places.iterator():
+        key = tuple(key)
+        if key in seen:
+            duplicates.append(place_id)
+        seen.add(key)
+
+    now = timezone.now()
+    for start in range(0, len(duplicates), 500):
+        Place.objects.filter(id__in = duplicates[start:start + 500]).update(deleted_at = now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0002_place_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(soft_delete_live_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='place',
+            constraint=models.UniqueConstraint(condition=models.Q(deleted_at__isnull=True), fields=('name', 'place_type', 'region', 'road_address'), name='places_unique_live_place'),
+        ),
+    ]
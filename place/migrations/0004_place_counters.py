@@ -0,0 +1,23 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0003_place_unique_live_place'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='checkin_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
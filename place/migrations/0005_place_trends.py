@@ -0,0 +1,34 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0004_place_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceTrend',
+            fields=[
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='place.place')),
+                ('score', models.FloatField()),
+                ('metro_region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='place.metroregion')),
+                ('place_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='place.placetype')),
+            ],
+            options={
+                'db_table': 'place_trends',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='placetrend',
+            index=models.Index(fields=['metro_region', '-score'], name='place_trends_metro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placetrend',
+            index=models.Index(fields=['metro_region', 'place_type', '-score'], name='place_trends_metro_type_idx'),
+        ),
+    ]
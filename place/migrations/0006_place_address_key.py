@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+from place.address import canonicalize_address
+
+
+def fill_address_keys(apps, schema_editor):
+    """기존 장소의 주소 키 채우기
+
+    정규화 후 같은 장소로 판별되는 기존 살아있는 중복 장소는 먼저 등록된 장소만 키를 그대로 쓰고,
+    나머지는 '#<id>'를 붙여 고유 제약을 통과시킨다.
+    """
+    Place = apps.get_model('place', 'Place')
+    seen  = set()
+    for place in Place.objects.order_by('id').iterator():
+        address_key = canonicalize_address(place.road_address)
+        key         = (place.name, place.place_type_id, place.region_id, address_key)
+        if place.deleted_at is None:
+            if key in seen:
+                address_key = f'{address_key}#{place.id}'
+            seen.add(key)
+        Place.objects.filter(id = place.id).update(address_key = address_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0005_place_trends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='address_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=60),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_address_keys, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='place',
+            name='places_unique_live_place',
+        ),
+        migrations.AddConstraint(
+            model_name='place',
+            constraint=models.UniqueConstraint(condition=models.Q(deleted_at__isnull=True), fields=('name', 'place_type', 'region', 'address_key'), name='places_unique_live_place'),
+        ),
+    ]
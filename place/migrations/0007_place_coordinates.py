@@ -0,0 +1,32 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0006_place_address_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='geohash',
+            field=models.CharField(editable=False, max_length=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='latitude',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='longitude',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['geohash', 'deleted_at'], name='places_geohash_idx'),
+        ),
+    ]
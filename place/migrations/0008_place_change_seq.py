@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def fill_change_seqs(apps, schema_editor):
+    """기존 장소에 수정 시각 순으로 변경 번호를 매기고 시퀀스를 마지막 번호로 맞춤"""
+    Place          = apps.get_model('place', 'Place')
+    ChangeSequence = apps.get_model('place', 'ChangeSequence')
+
+    change_seq = 0
+    for place_id in Place.objects.order_by('updated_at', 'id').values_list('id', flat = True).iterator():
+        change_seq += 1
+        Place.objects.filter(id = place_id).update(change_seq = change_seq)
+    ChangeSequence.objects.update_or_create(name = 'places', defaults = {'value': change_seq})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0007_place_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'change_sequences',
+            },
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='change_seq',
+            field=models.BigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_change_seqs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='place',
+            name='change_seq',
+            field=models.BigIntegerField(editable=False, unique=True),
+        ),
+    ]
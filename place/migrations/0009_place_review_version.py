@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0008_place_change_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='review_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
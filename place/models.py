@@ -1,4 +1,9 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+
+from .address import canonicalize_address
+from .geo import encode_geohash
+from theplaces.managers import LiveManager
 
 class MetroRegion(models.Model):
     """광역 지역 (특별시, 광역시, 도, 특별자치시, 특별자치도)"""
@@ -23,15 +28,120 @@ class PlaceType(models.Model):
         db_table = 'place_types'
 
 
+class ChangeSequence(models.Model):
+    """변경 피드용 단조 증가 번호
+
+    번호를 받는 UPDATE의 행 잠금이 트랜잭션 끝까지 유지되므로, 번호 순서가 커밋 순서와 같다.
+    반드시 변경을 저장하는 트랜잭션 안에서 allocate()를 호출한다.
+    """
+    name  = models.CharField(max_length=20, primary_key = True)
+    value = models.BigIntegerField(default = 0)
+
+    class Meta:
+        db_table = 'change_sequences'
+
+    @classmethod
+    def allocate(cls, name, count = 1):
+        """count개의 번호를 받아 마지막 번호를 반환 (받은 번호: 마지막 - count + 1 ~ 마지막)"""
+        if not cls.objects.filter(name = name).update(value = F('value') + count):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(name = name, value = count)
+                return count
+            except IntegrityError:
+                cls.objects.filter(name = name).update(value = F('value') + count)
+        return cls.objects.get(name = name).value
+
+    @classmethod
+    def current(cls, name):
+        return cls.objects.filter(name = name).values_list('value', flat = True).first() or 0
+
+    @classmethod
+    def raise_to(cls, name, value):
+        """번호를 value까지 올림 (이미 크면 그대로)"""
+        if not cls.objects.filter(name = name, value__lt = value).update(value = value):
+            cls.objects.get_or_create(name = name, defaults = {'value': value})
+
+
 class Place(models.Model):
     """장소 테이블"""
-    name = models.CharField(max_length=50)
-    place_type   = models.ForeignKey(PlaceType, on_delete = models.CASCADE)
-    region       = models.ForeignKey(LocalRegion, on_delete = models.CASCADE)
-    road_address = models.CharField(max_length=50)
-    created_at   = models.DateTimeField(auto_now_add = True)
-    updated_at   = models.DateTimeField(auto_now = True)
-    deleted_at   = models.DateTimeField(null = True)
+    name           = models.CharField(max_length=50)
+    place_type     = models.ForeignKey(PlaceType, on_delete = models.CASCADE)
+    region         = models.ForeignKey(LocalRegion, on_delete = models.CASCADE)
+    road_address   = models.CharField(max_length=50)
+    address_key    = models.CharField(max_length=60, db_index = True, editable = False)
+    latitude       = models.FloatField(null = True)
+    longitude      = models.FloatField(null = True)
+    geohash        = models.CharField(max_length=9, null = True, editable = False)
+    checkin_count  = models.PositiveIntegerField(default = 0)
+    review_count   = models.PositiveIntegerField(default = 0)
+    review_version = models.PositiveIntegerField(default = 0)
+    created_at     = models.DateTimeField(auto_now_add = True)
+    updated_at     = models.DateTimeField(auto_now = True)
+    deleted_at     = models.DateTimeField(null = True)
+    change_seq     = models.BigIntegerField(unique = True, editable = False)
+
+    objects        = LiveManager()
+    all_objects    = models.Manager()
 
     class Meta:
         db_table = 'places'
+        indexes  = [
+            models.Index(fields = ['region', 'place_type', 'deleted_at'], name = 'places_region_type_idx'),
+            models.Index(fields = ['place_type', 'deleted_at'], name = 'places_type_idx'),
+            models.Index(fields = ['geohash', 'deleted_at'], name = 'places_geohash_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields    = ['name', 'place_type', 'region', 'address_key'],
+                condition = Q(deleted_at__isnull = True),
+                name      = 'places_unique_live_place'
+            ),
+        ]
+
+    DERIVED_FIELDS = {
+        'road_address' : {'address_key'},
+        'latitude'     : {'geohash'},
+        'longitude'    : {'geohash'},
+    }
+
+    # update()로만 바꾸는 필드 (기존 행을 save()할 때 읽어 둔 값으로 덮어쓰지 않는다)
+    UPDATE_ONLY_FIELDS = {'checkin_count', 'review_count', 'review_version'}
+
+    CHANGE_SEQUENCE = 'places'
+    PURGED_SEQUENCE = 'places_purged'
+
+    def save(self, *args, **kwargs):
+        """파생 필드를 채우고 변경 번호를 새로 받아 저장 (카운터만 바꾸는 update()는 변경으로 보지 않음)"""
+        self.address_key = canonicalize_address(self.road_address)
+        self.geohash     = encode_geohash(self.latitude, self.longitude) if self.latitude is not None and self.longitude is not None else None
+
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields if not field.primary_key and field.name not in self.UPDATE_ONLY_FIELDS]
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'change_seq'}.union(*(self.DERIVED_FIELDS.get(field, set()) for field in update_fields))
+
+        with transaction.atomic():
+            self.change_seq = ChangeSequence.allocate(self.CHANGE_SEQUENCE)
+            super().save(*args, **kwargs)
+
+
+class PlaceTrend(models.Model):
+    """장소 인기도 (시간 감쇠 점수)
+
+    score는 place.trending.TRENDING_EPOCH 기준 로그 스케일 누적값이라 시간이 지나도 장소 간 순서가 바뀌지 않는다.
+    광역 지역, 장소 유형별 상위 K개는 인덱스를 score 역순으로 읽어 구한다.
+    """
+    place        = models.OneToOneField(Place, on_delete = models.CASCADE, primary_key = True)
+    metro_region = models.ForeignKey(MetroRegion, on_delete = models.CASCADE)
+    place_type   = models.ForeignKey(PlaceType, on_delete = models.CASCADE)
+    score        = models.FloatField()
+
+    class Meta:
+        db_table = 'place_trends'
+        indexes  = [
+            models.Index(fields = ['metro_region', '-score'], name = 'place_trends_metro_idx'),
+            models.Index(fields = ['metro_region', 'place_type', '-score'], name = 'place_trends_metro_type_idx'),
+        ]
@@ -0,0 +1,47 @@
+import heapq
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from .models import Place
+from .geo import GEOHASH_UPPER, bounding_box, search_cells, haversine
+
+
+def longitude_filter(lng_min, lng_max):
+    """경도 범위 조건 (날짜변경선을 넘으면 두 구간, 전체 경도면 조건 없음)"""
+    if lng_max - lng_min >= 360:
+        return Q()
+    if lng_min < -180:
+        return Q(longitude__gte = lng_min + 360) | Q(longitude__lte = lng_max)
+    if lng_max > 180:
+        return Q(longitude__gte = lng_min) | Q(longitude__lte = lng_max - 360)
+    return Q(longitude__range = (lng_min, lng_max))
+
+
+def nearby_place_ids(latitude, longitude, radius, place_type_ids = None, after = None, limit = None):
+    """반경 radius(m) 안의 살아있는 장소를 가까운 순으로 [(거리, 장소 id), ...] 반환
+
+    바운딩 박스를 덮는 geohash 접두어 범위로 후보를 인덱스에서 좁히고, 위도/경도 범위로 박스 밖의 행을 DB에서 거른 뒤 실제 거리로 거른다.
+    접두어 범위는 LIKE 대신 [접두어, 접두어 + '{') 비교로 조회해 인덱스를 그대로 쓴다.
+    after((거리, 장소 id))가 있으면 그 뒤부터, limit이 있으면 가까운 limit개만 전체 정렬 없이 반환한다.
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(latitude, longitude, radius)
+
+    cells  = search_cells(latitude, longitude, radius)
+    ranges = reduce(or_, (Q(geohash__gte = cell, geohash__lt = cell + GEOHASH_UPPER) for cell in sorted(cells)))
+    places = Place.objects.filter(ranges, longitude_filter(lng_min, lng_max), latitude__range = (lat_min, lat_max))
+
+    if place_type_ids is not None:
+        places = places.filter(place_type_id__in = place_type_ids)
+
+    result = []
+    for place_id, place_latitude, place_longitude in places.values_list('id', 'latitude', 'longitude'):
+        distance = haversine(latitude, longitude, place_latitude, place_longitude)
+        if distance <= radius and (after is None or (distance, place_id) > after):
+            result.append((distance, place_id))
+
+    if limit is not None:
+        return heapq.nsmallest(limit, result)
+    result.sort()
+    return result
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .autocomplete import place_name_index
+from .cache import lookup_cache
+from .models import MetroRegion, LocalRegion, PlaceType, Place
+
+
+@receiver(post_save, sender = MetroRegion)
+@receiver(post_save, sender = LocalRegion)
+@receiver(post_save, sender = PlaceType)
+@receiver(post_delete, sender = MetroRegion)
+@receiver(post_delete, sender = LocalRegion)
+@receiver(post_delete, sender = PlaceType)
+def invalidate_lookup_cache(sender, **kwargs):
+    """참조 테이블 변경 시 조회 캐시 무효화 (커밋 이후에도 한 번 더 무효화)"""
+    lookup_cache.invalidate()
+    transaction.on_commit(lookup_cache.invalidate)
+
+
+@receiver(post_save, sender = Place)
+def update_place_name_index(sender, instance, **kwargs):
+    """장소 등록, 수정, 소프트 삭제 시 자동완성 인덱스 반영"""
+    if instance.deleted_at is not None:
+        place_name_index.remove(instance.id)
+        return
+
+    try:
+        metro_region_id = lookup_cache.metro_region_id_of(instance.region_id)
+    except LocalRegion.DoesNotExist:
+        metro_region_id = None
+    place_name_index.upsert(instance.id, instance.name, metro_region_id)
+
+
+@receiver(post_delete, sender = Place)
+def delete_place_name_index(sender, instance, **kwargs):
+    place_name_index.remove(instance.id)
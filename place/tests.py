@@ -1,9 +1,29 @@
 import json
-
-from django.test import TestCase, Client
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, router
+from django.db.utils import ConnectionDoesNotExist
+from django.http import HttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-
-from .models import MetroRegion, LocalRegion, PlaceType, Place
+from datetime import timedelta
+
+from .models import MetroRegion, LocalRegion, PlaceType, Place, PlaceTrend
+from .address import canonicalize_address
+from .importer import import_places
+from .autocomplete import place_name_index, _Snapshot
+from .trending import CHECKIN_WEIGHT, REVIEW_WEIGHT, record_event, decayed_score
+from archive.models import CheckIn, Review
+from user.models import User
+from theplaces.routers import STICKY_COOKIE, ReplicaMiddleware
+from theplaces.utils import stream_json_list
 
 class CreateTest(TestCase):
     def setUp(self):
@@ -35,6 +55,62 @@ class CreateTest(TestCase):
         self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
         self.assertEquals(response.status_code, 201)
 
+    def test_create_lookup_cached(self):
+        client = Client()
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 327',
+                'name'         : '테스트'
+                }
+        client.post('/place/', json.dumps(data), content_type='application/json')
+
+        data['name'] = '캐시테스트'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/place/', json.dumps(data), content_type='application/json')
+
+        lookup_queries = [query['sql'] for query in queries if any(table in query['sql'] for table in ('"metro_regions"', '"local_regions"', '"place_types"'))]
+        self.assertEquals(lookup_queries, [])
+        self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
+
+    def test_create_new_place_type(self):
+        client = Client()
+        data = {
+                'place_type'   : '새타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 327',
+                'name'         : '테스트'
+                }
+
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+        self.assertEquals(response.json(), {"message": "INVALID_PLACE_TYPE"})
+
+        PlaceType.objects.create(name='새타입')
+
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+        self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
+        self.assertEquals(response.status_code, 201)
+
+    @override_settings(PLACE_LOOKUP_MISS_RELOAD_INTERVAL = 0)
+    def test_create_place_type_added_elsewhere(self):
+        client = Client()
+        data = {
+                'place_type'   : '다른프로세스타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 327',
+                'name'         : '테스트'
+                }
+        client.get('/place/', content_type='application/json')
+
+        # 다른 프로세스에서 추가된 것처럼 signal 없이 추가
+        PlaceType.objects.bulk_create([PlaceType(name='다른프로세스타입')])
+
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+        self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
+
     def test_address_format(self):
         client = Client()
         data = {
@@ -65,6 +141,44 @@ class CreateTest(TestCase):
         self.assertEquals(response.json(), {"message": "EXIST_PLACE"})
         self.assertEquals(response.status_code, 400)
 
+    def test_duplicate_address_variant(self):
+        client = Client()
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '중복테스트로 1 ',
+                'name'         : '중복테스트'
+                }
+
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+
+        self.assertEquals(response.json(), {"message": "EXIST_PLACE"})
+        self.assertEquals(response.status_code, 400)
+
+    def test_canonicalize_address(self):
+        self.assertEquals(canonicalize_address('테헤란로  1'), canonicalize_address('테헤란로1'))
+        self.assertEquals(canonicalize_address('중앙동 1 – 03'), '중앙동1-3')
+        self.assertEquals(canonicalize_address('Ａ로 10, 2층'), 'a로10/2층')
+        self.assertNotEqual(canonicalize_address('테헤란로 1'), canonicalize_address('테헤란로 11'))
+        self.assertEquals(Place.objects.get(name = '중복테스트').address_key, '중복테스트로1')
+
+    def test_duplicate_after_delete(self):
+        client = Client()
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '중복테스트로 1',
+                'name'         : '중복테스트'
+                }
+
+        Place.objects.filter(name = '중복테스트').update(deleted_at = timezone.now())
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+
+        self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
+        self.assertEquals(Place.all_objects.filter(name = '중복테스트').count(), 2)
+
     def test_duplicate_2(self):
         client = Client()
         data = {
@@ -81,6 +195,95 @@ class CreateTest(TestCase):
         self.assertEquals(response.status_code, 201)
 
 
+class ImportTest(TestCase):
+    def setUp(self):
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        Place.objects.create(place_type = test_type, region = test_local, road_address = '중복테스트로 1', name = '중복테스트')
+
+    def tearDown(self):
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_import_csv(self):
+        client = Client()
+        data = (
+                'place_type,metro_region,local_region,road_address,name\n'
+                '테스트타입,테스트광역시,테스트구,테스트로 1,테스트\n'
+                '테스트타입,테스트광역시,테스트구,중복테스트로 1,중복테스트\n'
+                '테스트타입,테스트광역시,테스트구,테스트,주소오류\n'
+                '없는타입,테스트광역시,테스트구,테스트로 2,유형오류\n'
+                '테스트타입,테스트광역시,테스트구,테스트로 1,테스트\n'
+                '테스트타입,테스트광역시,테스트구,테스트로 １,테스트\n'
+                )
+
+        response = client.post('/place/import', data.encode('utf-8'), content_type='text/csv')
+
+        self.assertEquals(response.json(), {
+            "message": "PLACES_IMPORTED",
+            "created": 1,
+            "errors" : [
+                {"row": 2, "message": "EXIST_PLACE"},
+                {"row": 3, "message": "INVALID_ROAD_ADDRESS_FORMAT"},
+                {"row": 4, "message": "INVALID_PLACE_TYPE"},
+                {"row": 5, "message": "EXIST_PLACE"},
+                {"row": 6, "message": "EXIST_PLACE"},
+            ]
+        })
+        self.assertEquals(response.status_code, 201)
+        self.assertEquals(Place.objects.filter(name = '테스트').count(), 1)
+
+    def test_import_invalid_values(self):
+        client = Client()
+        row    = {'place_type': '테스트타입', 'metro_region': '테스트광역시', 'local_region': '테스트구', 'road_address': '테스트로 1', 'name': '테스트'}
+        lines  = [
+                json.dumps({**row, 'road_address': 123}).encode('utf-8'),
+                json.dumps({**row, 'place_type': ['테스트타입']}).encode('utf-8'),
+                json.dumps(row, ensure_ascii=False).encode('utf-8').replace('테스트"}'.encode('utf-8'), b'\xff"}'),
+                json.dumps(row, ensure_ascii=False).encode('utf-8'),
+                ]
+
+        response = client.post('/place/import', b'\n'.join(lines), content_type='application/x-ndjson')
+
+        self.assertEquals(response.json(), {
+            "message": "PLACES_IMPORTED",
+            "created": 1,
+            "errors" : [
+                {"row": 1, "message": "INVALID_ROW"},
+                {"row": 2, "message": "INVALID_ROW"},
+                {"row": 3, "message": "INVALID_ENCODING"},
+            ]
+        })
+        self.assertEquals(response.status_code, 201)
+
+    def test_import_invalid_content_type(self):
+        client = Client()
+
+        response = client.post('/place/import', '{}', content_type='application/json')
+
+        self.assertEquals(response.json(), {"message": "INVALID_CONTENT_TYPE"})
+        self.assertEquals(response.status_code, 400)
+
+    def test_import_command(self):
+        rows = [
+                {'place_type': '테스트타입', 'metro_region': '테스트광역시', 'local_region': '테스트구', 'road_address': '테스트로 1', 'name': '테스트'},
+                {'place_type': '테스트타입', 'metro_region': '없는광역시', 'local_region': '테스트구', 'road_address': '테스트로 2', 'name': '지역오류'},
+                ]
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8') as f:
+            f.write('\n'.join(json.dumps(row, ensure_ascii=False) for row in rows) + '\n{invalid\n')
+            f.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_places', f.name, batch_size = 1, stdout = stdout, stderr = stderr)
+
+        self.assertIn('created: 1, failed: 2', stdout.getvalue())
+        self.assertEquals(stderr.getvalue().splitlines(), ['row 2: INVALID_REGION', 'row 3: INVALID_ROW'])
+        self.assertTrue(Place.objects.filter(name = '테스트', road_address = '테스트로 1').exists())
+
+
 class readTest(TestCase):
     def setUp(self):
         test_metro = MetroRegion.objects.create(name='테스트광역시')
@@ -101,9 +304,74 @@ class readTest(TestCase):
 
         response = client.get('/place/', content_type = 'application/json')
 
-        self.assertEquals(response.json(), {"result" :[{"id": 1, "name": "테스트", "type": "테스트타입", "road_address": "테스트로 1", "local_region": "테스트구", "metro_region": "테스트광역시"}]})
+        self.assertEquals(response.json(), {"result" :[{"id": 1, "name": "테스트", "type": "테스트타입", "road_address": "테스트로 1", "local_region": "테스트구", "metro_region": "테스트광역시", "latitude": None, "longitude": None, "checkin_count": 0, "review_count": 0}], "next": None})
+        self.assertEquals(response.status_code, 200)
+
+    def test_read_pagination(self):
+        client = Client()
+        Place.objects.create(id = 3, place_type = PlaceType.objects.get(name = '테스트타입'), region = LocalRegion.objects.get(name = '테스트구'), road_address = '테스트로 3', name = '테스트3')
+
+        response = client.get('/place/', {'limit': 1}, content_type = 'application/json')
+
+        self.assertEquals([place['id'] for place in response.json()['result']], [1])
         self.assertEquals(response.status_code, 200)
 
+        response = client.get('/place/', {'limit': 1, 'cursor': response.json()['next']}, content_type = 'application/json')
+
+        self.assertEquals([place['id'] for place in response.json()['result']], [3])
+        self.assertEquals(response.json()['next'], None)
+
+    def test_read_filter(self):
+        client     = Client()
+        test_metro = MetroRegion.objects.create(name='필터광역시')
+        test_local = LocalRegion.objects.create(name='필터구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='필터타입')
+        Place.objects.create(id = 3, place_type = test_type, region = test_local, road_address = '필터로 1', name = '필터')
+        Place.objects.create(id = 4, place_type = PlaceType.objects.get(name = '테스트타입'), region = test_local, road_address = '필터로 2', name = '필터2')
+
+        response = client.get('/place/', {'metro_region': ['필터광역시'], 'place_type': ['필터타입', '없는타입']}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [3])
+
+        response = client.get('/place/', {'local_region': ['테스트구', '필터구'], 'place_type': '테스트타입'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1, 4])
+        self.assertEquals(response.status_code, 200)
+
+    def test_read_stream(self):
+        client = Client()
+        Place.objects.create(id = 3, place_type = PlaceType.objects.get(name = '테스트타입'), region = LocalRegion.objects.get(name = '테스트구'), road_address = '테스트로 3', name = '테스트3')
+
+        response = client.get('/place/', {'stream': 'true', 'limit': 1}, content_type = 'application/json')
+        result   = json.loads(b''.join(response.streaming_content))
+
+        self.assertEquals([place['id'] for place in result['result']], [1, 3])
+        self.assertEquals(response.status_code, 200)
+
+    def test_read_not_modified(self):
+        client   = Client()
+        response = client.get('/place/', content_type = 'application/json')
+        etag     = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = client.get('/place/', content_type = 'application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response.content, b'')
+
+        Place.objects.filter(id = 1).update(checkin_count = 1)
+        response = client.get('/place/', content_type = 'application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = client.get('/place/', {'limit': 1}, content_type = 'application/json', HTTP_IF_NONE_MATCH = etag)
+        self.assertEquals(response.status_code, 200)
+
+    def test_read_invalid_cursor(self):
+        client = Client()
+
+        response = client.get('/place/', {'cursor': 'invalid'}, content_type = 'application/json')
+
+        self.assertEquals(response.json(), {"message": "INVALID_CURSOR"})
+        self.assertEquals(response.status_code, 400)
+
 class updateTest(TestCase):
     def setUp(self):
         test_metro = MetroRegion.objects.create(name='테스트광역시')
@@ -152,6 +420,22 @@ class updateTest(TestCase):
         self.assertEquals(response.json(), {"message": "INVALID_ROAD_ADDRESS_FORMAT"})
         self.assertEquals(response.status_code, 400)
 
+    def test_duplicate_update(self):
+        client = Client()
+        Place.objects.create(id = 3, place_type = PlaceType.objects.get(name = '테스트타입'), region = LocalRegion.objects.get(name = '테스트구'), road_address = '테스트로 3', name = '테스트3')
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 3',
+                'name'         : '테스트3'
+                }
+
+        response = client.patch('/place/1', json.dumps(data), content_type='application/json')
+
+        self.assertEquals(response.json(), {"message": "EXIST_PLACE"})
+        self.assertEquals(response.status_code, 400)
+
     def test_deleted_place_update(self):
         client = Client()
         data = {
@@ -191,7 +475,7 @@ class deleteTest(TestCase):
         self.assertEquals(response.json(), {"message": "PLACE_DELETED"})
         self.assertEquals(response.status_code, 200)
 
-        self.assertEquals(str(type(Place.objects.get(id=1).deleted_at)), "<class 'datetime.datetime'>")
+        self.assertEquals(str(type(Place.all_objects.get(id=1).deleted_at)), "<class 'datetime.datetime'>")
 
     def test_deleted_place_delete(self):
         client = Client()
@@ -210,3 +494,356 @@ class deleteTest(TestCase):
         self.assertEquals(response.status_code, 401)
 
 
+
+
+class TrendingTest(TestCase):
+    def setUp(self):
+        test_metro   = MetroRegion.objects.create(name='테스트광역시')
+        other_metro  = MetroRegion.objects.create(name='다른광역시')
+        test_local   = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        other_local  = LocalRegion.objects.create(name='다른구', metro_region=other_metro)
+        test_type    = PlaceType.objects.create(name='테스트타입')
+        other_type   = PlaceType.objects.create(name='다른타입')
+        Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '테스트')
+        Place.objects.create(id = 2, place_type = other_type, region = test_local, road_address = '테스트로 2', name = '테스트2')
+        Place.objects.create(id = 3, place_type = test_type, region = other_local, road_address = '테스트로 3', name = '테스트3')
+
+        now = timezone.now()
+        for _ in range(3):
+            record_event(1, CHECKIN_WEIGHT, now - timedelta(days = 3))
+        record_event(2, CHECKIN_WEIGHT, now)
+        record_event(3, REVIEW_WEIGHT, now)
+
+    def tearDown(self):
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_trending(self):
+        client = Client()
+
+        response = client.get('/place/trending', {'metro_region': '테스트광역시'}, content_type = 'application/json')
+
+        self.assertEquals([place['id'] for place in response.json()['result']], [2, 1])
+        self.assertAlmostEqual(response.json()['result'][1]['score'], 3 / 8, places = 3)
+        self.assertEquals(response.status_code, 200)
+
+        response = client.get('/place/trending', {'metro_region': '테스트광역시', 'place_type': '테스트타입'}, content_type = 'application/json')
+
+        self.assertEquals([place['id'] for place in response.json()['result']], [1])
+
+    def test_trending_invalid_region(self):
+        client = Client()
+
+        response = client.get('/place/trending', {'metro_region': '없는광역시'}, content_type = 'application/json')
+
+        self.assertEquals(response.json(), {"message": "INVALID_REGION"})
+        self.assertEquals(response.status_code, 400)
+
+    def test_recompute_command(self):
+        user = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+        CheckIn.objects.create(user = user, place_id = 2)
+        Review.objects.create(user = user, place_id = 3, body = '테스트 리뷰입니다.')
+        Review.objects.create(user = user, place_id = 3, body = '삭제된 리뷰입니다.', deleted_at = timezone.now())
+
+        call_command('recompute_trending', stdout = StringIO())
+
+        scores = {trend.place_id: decayed_score(trend.score) for trend in PlaceTrend.objects.all()}
+        self.assertEquals(sorted(scores), [2, 3])
+        self.assertAlmostEqual(scores[2], CHECKIN_WEIGHT, places = 3)
+        self.assertAlmostEqual(scores[3], REVIEW_WEIGHT, places = 3)
+        User.objects.all().delete()
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        test_metro  = MetroRegion.objects.create(name='테스트광역시')
+        other_metro = MetroRegion.objects.create(name='다른광역시')
+        test_local  = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        other_local = LocalRegion.objects.create(name='다른구', metro_region=other_metro)
+        test_type   = PlaceType.objects.create(name='테스트타입')
+        Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '스타벅스 강남점')
+        Place.objects.create(id = 2, place_type = test_type, region = other_local, road_address = '테스트로 2', name = '스타벅스 부산점')
+        Place.objects.create(id = 3, place_type = test_type, region = test_local, road_address = '테스트로 3', name = '서브웨이')
+        Place.objects.create(id = 4, place_type = test_type, region = test_local, road_address = '테스트로 4', name = '스타일샵', deleted_at = timezone.now())
+        place_name_index.clear()
+
+    def tearDown(self):
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_autocomplete(self):
+        client = Client()
+
+        response = client.get('/place/autocomplete', {'q': '스타'}, content_type = 'application/json')
+        self.assertEquals(response.json(), {"result": [{"id": 1, "name": "스타벅스 강남점"}, {"id": 2, "name": "스타벅스 부산점"}]})
+        self.assertEquals(response.status_code, 200)
+
+        response = client.get('/place/autocomplete', {'q': 'ㅅㅂ'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [3])
+
+        response = client.get('/place/autocomplete', {'q': '스ㅌㅂ', 'metro_region': '다른광역시'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [2])
+
+    def test_autocomplete_incremental(self):
+        client = Client()
+        client.get('/place/autocomplete', {'q': 'ㅅ'}, content_type = 'application/json')
+
+        place      = Place.objects.get(id = 3)
+        place.name = '써브웨이'
+        place.save()
+        Place.objects.create(id = 5, place_type = place.place_type, region = place.region, road_address = '테스트로 5', name = '스시집')
+        client.delete('/place/1', content_type = 'application/json')
+
+        response = client.get('/place/autocomplete', {'q': 'ㅅ'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [5, 2])
+
+        response = client.get('/place/autocomplete', {'q': 'ㅆ'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [3])
+
+    def test_autocomplete_import(self):
+        place_name_index.search('스')
+        import_places([{'place_type': '테스트타입', 'metro_region': '테스트광역시', 'local_region': '테스트구', 'road_address': '테스트로 9', 'name': '스시공방'}])
+
+        with self.assertNumQueries(0):
+            result = place_name_index.search('스시')
+        self.assertEquals([place['name'] for place in result], ['스시공방'])
+
+    def test_autocomplete_background_refresh(self):
+        place_name_index.search('스')
+        release  = threading.Event()
+        rebuilt  = _Snapshot()
+        rebuilt.add(9, '스타필드', None)
+
+        def build():
+            release.wait(5)
+            return rebuilt
+
+        with mock.patch.object(place_name_index, '_build', build):
+            place_name_index.invalidate()
+
+            with self.assertNumQueries(0):
+                result = place_name_index.search('스타')
+            self.assertEquals([place['id'] for place in result], [1, 2])
+
+            release.set()
+            place_name_index._refresh_thread.join(5)
+
+        self.assertEquals([place['id'] for place in place_name_index.search('스타')], [9])
+
+
+class NearbyTest(TestCase):
+    def setUp(self):
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        other_type = PlaceType.objects.create(name='다른타입')
+        Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '역앞', latitude = 37.4979, longitude = 127.0276)
+        Place.objects.create(id = 2, place_type = test_type, region = test_local, road_address = '테스트로 2', name = '북쪽500m', latitude = 37.5024, longitude = 127.0276)
+        Place.objects.create(id = 3, place_type = test_type, region = test_local, road_address = '테스트로 3', name = '북쪽3km', latitude = 37.5249, longitude = 127.0276)
+        Place.objects.create(id = 4, place_type = test_type, region = test_local, road_address = '테스트로 4', name = '삭제됨', latitude = 37.4980, longitude = 127.0276, deleted_at = timezone.now())
+        Place.objects.create(id = 5, place_type = other_type, region = test_local, road_address = '테스트로 5', name = '동쪽200m', latitude = 37.4979, longitude = 127.0299)
+        Place.objects.create(id = 6, place_type = test_type, region = test_local, road_address = '테스트로 6', name = '좌표없음')
+
+    def tearDown(self):
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_nearby(self):
+        client = Client()
+
+        response = client.get('/place/nearby', {'lat': 37.4979, 'lng': 127.0276, 'radius': 1000}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1, 5, 2])
+        self.assertEquals(response.json()['result'][2]['distance'], 500.4)
+        self.assertEquals(response.status_code, 200)
+
+        response = client.get('/place/nearby', {'lat': 37.4979, 'lng': 127.0276, 'radius': 5000, 'place_type': '테스트타입'}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1, 2, 3])
+
+    def test_nearby_pagination(self):
+        client = Client()
+
+        response = client.get('/place/nearby', {'lat': 37.4979, 'lng': 127.0276, 'radius': 5000, 'limit': 2}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1, 5])
+
+        response = client.get('/place/nearby', {'lat': 37.4979, 'lng': 127.0276, 'radius': 5000, 'limit': 2, 'cursor': response.json()['next']}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [2, 3])
+        self.assertEquals(response.json()['next'], None)
+
+    def test_nearby_cell_boundary(self):
+        place = Place.objects.get(id = 1)
+        place.latitude, place.longitude = -0.0001, -0.0001
+        place.save(update_fields = ['latitude', 'longitude'])
+        self.assertEquals(Place.objects.get(id = 1).geohash[0], '7')
+
+        client = Client()
+        response = client.get('/place/nearby', {'lat': 0.0001, 'lng': 0.0001, 'radius': 100}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1])
+
+    def test_nearby_antimeridian(self):
+        place = Place.objects.get(id = 1)
+        place.latitude, place.longitude = 0, 179.9995
+        place.save(update_fields = ['latitude', 'longitude'])
+
+        client = Client()
+        response = client.get('/place/nearby', {'lat': 0, 'lng': -179.9995, 'radius': 500}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1])
+        self.assertEquals(response.json()['result'][0]['distance'], 111.2)
+
+    def test_nearby_invalid(self):
+        client = Client()
+
+        response = client.get('/place/nearby', {'lat': 91, 'lng': 127}, content_type = 'application/json')
+        self.assertEquals(response.json(), {"message": "INVALID_COORDINATES"})
+        self.assertEquals(response.status_code, 400)
+
+        response = client.get('/place/nearby', {'lat': 37, 'lng': 127, 'radius': 100000}, content_type = 'application/json')
+        self.assertEquals(response.json(), {"message": "INVALID_RADIUS"})
+
+    def test_create_with_coordinates(self):
+        client = Client()
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 7',
+                'name'         : '새장소',
+                'latitude'     : 37.4979,
+                'longitude'    : 127.0276
+                }
+
+        response = client.post('/place/', json.dumps(data), content_type='application/json')
+
+        self.assertEquals(response.json(), {"message": "PLACE_CREATED"})
+        self.assertEquals(Place.objects.get(name = '새장소').geohash, 'wydm6d69j')
+
+        data['latitude'] = 'north'
+        response = client.patch('/place/1', json.dumps(data), content_type='application/json')
+        self.assertEquals(response.json(), {"message": "INVALID_COORDINATES"})
+
+
+class ChangesTest(TestCase):
+    def setUp(self):
+        test_metro = MetroRegion.objects.create(name='테스트광역시')
+        test_local = LocalRegion.objects.create(name='테스트구', metro_region=test_metro)
+        test_type  = PlaceType.objects.create(name='테스트타입')
+        Place.objects.create(id = 1, place_type = test_type, region = test_local, road_address = '테스트로 1', name = '테스트1')
+        Place.objects.create(id = 2, place_type = test_type, region = test_local, road_address = '테스트로 2', name = '테스트2')
+
+    def tearDown(self):
+        MetroRegion.objects.all().delete()
+        LocalRegion.objects.all().delete()
+        PlaceType.objects.all().delete()
+        Place.objects.all().delete()
+
+    def test_changes(self):
+        client = Client()
+
+        response = client.get('/place/changes', content_type = 'application/json')
+        self.assertEquals([(place['id'], place['deleted']) for place in response.json()['result']], [(1, False), (2, False)])
+        self.assertEquals(response.json()['has_more'], False)
+        since = response.json()['next']
+
+        response = client.get('/place/changes', {'since': since}, content_type = 'application/json')
+        self.assertEquals(response.json(), {"result": [], "next": since, "has_more": False})
+
+        data = {
+                'place_type'   : '테스트타입',
+                'metro_region' : '테스트광역시',
+                'local_region' : '테스트구',
+                'road_address' : '테스트로 1',
+                'name'         : '수정'
+                }
+        client.patch('/place/1', json.dumps(data), content_type='application/json')
+        client.delete('/place/2', content_type='application/json')
+        Place.objects.filter(id = 1).update(checkin_count = 5)
+
+        response = client.get('/place/changes', {'since': since}, content_type = 'application/json')
+        self.assertEquals([(place['id'], place['deleted']) for place in response.json()['result']], [(1, False), (2, True)])
+        self.assertEquals(response.json()['result'][0]['name'], '수정')
+        self.assertEquals(response.json()['result'][1], {"id": 2, "deleted": True})
+
+    def test_changes_pagination(self):
+        client = Client()
+
+        response = client.get('/place/changes', {'limit': 1}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [1])
+        self.assertEquals(response.json()['has_more'], True)
+
+        response = client.get('/place/changes', {'limit': 1, 'since': response.json()['next']}, content_type = 'application/json')
+        self.assertEquals([place['id'] for place in response.json()['result']], [2])
+        self.assertEquals(response.json()['has_more'], False)
+
+    def test_import_assigns_change_seq(self):
+        place_type = PlaceType.objects.get(name = '테스트타입')
+        before     = Place.objects.get(id = 2).change_seq
+        rows       = [{'place_type': '테스트타입', 'metro_region': '테스트광역시', 'local_region': '테스트구', 'road_address': f'테스트로 {number}', 'name': f'가져오기{number}'} for number in (3, 4)]
+        import_places(rows)
+
+        self.assertEquals(sorted(Place.objects.filter(place_type = place_type, name__startswith = '가져오기').values_list('change_seq', flat = True)), [before + 1, before + 2])
+
+
+@override_settings(DATABASE_READ_REPLICAS = ['replica1'])
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.status  = 200
+        self.aliases = []
+
+        def get_response(request):
+            self.aliases.append(router.db_for_read(Place))
+            return HttpResponse(status = self.status)
+        self.middleware = ReplicaMiddleware(get_response)
+
+    def request(self, method, path, cookies = None):
+        request = getattr(self.factory, method)(path)
+        request.COOKIES.update(cookies or {})
+        response = self.middleware(request)
+        return self.aliases[-1], response
+
+    def test_safe_methods_read_replica(self):
+        self.assertEquals(self.request('get', '/place/')[0], 'replica1')
+        self.assertEquals(self.request('post', '/place/')[0], 'default')
+        self.assertEquals(router.db_for_read(Place), 'default')
+
+    def test_view_opt_out(self):
+        self.assertEquals(self.request('get', '/archive/review/place/1')[0], 'default')
+        self.assertEquals(self.request('get', '/unknown')[0], 'default')
+
+    def test_sticky_after_write(self):
+        self.status = 201
+        _, response = self.request('post', '/place/')
+        cookies     = {STICKY_COOKIE: response.cookies[STICKY_COOKIE].value}
+
+        self.status = 200
+        self.assertEquals(self.request('get', '/place/', cookies)[0], 'default')
+        self.assertEquals(self.request('get', '/place/')[0], 'replica1')
+        self.assertEquals(self.request('get', '/place/', {STICKY_COOKIE: str(time.time() - 60)})[0], 'replica1')
+        self.assertEquals(self.request('get', '/place/', {STICKY_COOKIE: 'invalid'})[0], 'replica1')
+
+    def test_stream_keeps_read_alias(self):
+        middleware = ReplicaMiddleware(lambda request: stream_json_list(Place.objects.values_list('id', flat = True), str))
+        response   = middleware(self.factory.get('/place/'))
+
+        # 테스트에는 replica1 연결이 없으므로, 본문을 읽을 때 replica1로 조회하면 ConnectionDoesNotExist가 발생한다
+        with self.assertRaises(ConnectionDoesNotExist):
+            b''.join(response.streaming_content)
+
+    def test_failed_write_not_sticky(self):
+        self.status = 400
+        _, response = self.request('post', '/place/')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_STICKY_CACHE_ALIAS = 'default')
+    def test_sticky_cache_must_be_shared(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ReplicaMiddleware(lambda request: HttpResponse())
+
+    @override_settings(DATABASE_READ_REPLICAS = [])
+    def test_no_replicas(self):
+        self.assertEquals(self.request('get', '/place/')[0], 'default')
@@ -0,0 +1,78 @@
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Place, PlaceTrend
+
+TRENDING_EPOCH = datetime(2021, 1, 1, tzinfo = timezone.utc)
+CHECKIN_WEIGHT = 1.0
+REVIEW_WEIGHT  = 2.0
+
+
+def decay_rate():
+    """초당 감쇠율 (TRENDING_HALF_LIFE_HOURS마다 점수가 절반으로 줄어듦)"""
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def event_score(weight, at):
+    """at 시각에 발생한 가중치 weight 이벤트의 로그 스케일 점수"""
+    return math.log(weight) + decay_rate() * (at - TRENDING_EPOCH).total_seconds()
+
+
+def add_scores(a, b):
+    """로그 스케일 점수 합 log(exp(a) + exp(b))"""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def decayed_score(score, now = None):
+    """로그 스케일 점수를 현재 시각 기준 감쇠 점수로 변환"""
+    return math.exp(score - decay_rate() * ((now or timezone.now()) - TRENDING_EPOCH).total_seconds())
+
+
+def record_event(place_id, weight, at = None):
+    """체크인, 리뷰 작성 시 장소 인기도 점수 누적 (작성과 같은 트랜잭션 안에서 호출)"""
+    record_score(place_id, event_score(weight, at or timezone.now()))
+
+
+def record_score(place_id, score):
+    """로그 스케일 점수를 장소 인기도에 누적 (여러 이벤트는 add_scores로 합쳐 한 번에 반영)"""
+    updated = _add_to_trend(place_id, score)
+    if updated:
+        return
+
+    place = Place.objects.select_related('region').get(id = place_id)
+    try:
+        with transaction.atomic():
+            PlaceTrend.objects.create(
+                place_id        = place_id,
+                metro_region_id = place.region.metro_region_id,
+                place_type_id   = place.place_type_id,
+                score           = score
+            )
+    except IntegrityError:
+        _add_to_trend(place_id, score)
+
+
+def _add_to_trend(place_id, score):
+    trend = PlaceTrend.objects.select_for_update().filter(place_id = place_id).first()
+    if trend is None:
+        return False
+
+    trend.score = add_scores(trend.score, score)
+    trend.save(update_fields = ['score'])
+    return True
+
+
+def top_places(metro_region_id, place_type_id = None, limit = 20):
+    """광역 지역(및 장소 유형)별 인기도 상위 장소 목록"""
+    trends = PlaceTrend.objects.filter(metro_region_id = metro_region_id, place__deleted_at__isnull = True)
+    if place_type_id is not None:
+        trends = trends.filter(place_type_id = place_type_id)
+
+    return trends.select_related('place__place_type', 'place__region__metro_region').order_by('-score')[:limit]
@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import PlaceCreateView, PlaceView
+from .views import PlaceCreateView, AsyncPlaceCreateView, PlaceImportView, PlaceTrendingView, PlaceAutocompleteView, PlaceNearbyView, PlaceChangesView, PlaceView
+
+place_create_view = AsyncPlaceCreateView if settings.ASYNC_VIEWS else PlaceCreateView
 
 urlpatterns = [
-    path('/', PlaceCreateView.as_view()),
+    path('/', place_create_view.as_view()),
+    path('/import', PlaceImportView.as_view()),
+    path('/trending', PlaceTrendingView.as_view()),
+    path('/autocomplete', PlaceAutocompleteView.as_view()),
+    path('/nearby', PlaceNearbyView.as_view()),
+    path('/changes', PlaceChangesView.as_view()),
     path('/<int:place_pk>', PlaceView.as_view())
 ]
 
@@ -1,42 +1,126 @@
 import json
 import re
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views import View
 from django.utils import timezone
 
-from .models import MetroRegion, LocalRegion, PlaceType, Place
+from .models import MetroRegion, LocalRegion, PlaceType, Place, PlaceTrend, ChangeSequence
+from .cache import lookup_cache
+from .address import REGEX_ROAD_ADDRESS
+from .importer import read_rows, import_places
+from .trending import top_places, decayed_score
+from .autocomplete import place_name_index
+from .geo import parse_coordinates
+from .nearby import nearby_place_ids
+from theplaces.async_views import AsyncView, db_handler, run_db
+from theplaces.serialization import Projection, json_response
+from theplaces.utils import get_page_limit, encode_cursor, decode_cursor, make_etag, is_stream_request, stream_json_list
+
+
+PLACE_PROJECTION = Projection(
+    id            = 'id',
+    name          = 'name',
+    type          = 'place_type__name',
+    road_address  = 'road_address',
+    local_region  = 'region__name',
+    metro_region  = 'region__metro_region__name',
+    latitude      = 'latitude',
+    longitude     = 'longitude',
+    checkin_count = 'checkin_count',
+    review_count  = 'review_count',
+)
+
+
+def get_radius(request):
+    """radius 쿼리 파라미터 (m, 기본 NEARBY_RADIUS_DEFAULT, 최대 NEARBY_RADIUS_MAX)"""
+    radius = request.GET.get('radius')
+    if radius is None:
+        return settings.NEARBY_RADIUS_DEFAULT
+
+    try:
+        radius = float(radius)
+    except ValueError:
+        raise ValueError("INVALID_RADIUS")
+    if not 0 < radius <= settings.NEARBY_RADIUS_MAX:
+        raise ValueError("INVALID_RADIUS")
+    return radius
+
+def filter_places(request):
+    """장소 목록 쿼리 파라미터(필터, 커서)를 적용한 살아있는 장소 쿼리셋 (id순)"""
+    places = Place.objects.order_by('id')
+
+    metro_regions = request.GET.getlist('metro_region')
+    local_regions = request.GET.getlist('local_region')
+    place_types   = request.GET.getlist('place_type')
+
+    if metro_regions or local_regions:
+        places = places.filter(region_id__in = lookup_cache.local_region_ids(
+            names            = local_regions or None,
+            metro_region_ids = lookup_cache.metro_region_ids(metro_regions) if metro_regions else None
+        ))
+    if place_types:
+        places = places.filter(place_type_id__in = lookup_cache.place_type_ids(place_types))
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        last_id, = decode_cursor(cursor, (int,))
+        places   = places.filter(id__gt = last_id)
+    return places
+
+
+def place_list_etag(request):
+    """장소 목록 페이지의 ETag
+
+    페이지에 들어갈 행의 id, 수정 시각, 유형/지역 id, 카운터만 조인 없이 읽어 만든다.
+    응답 내용이 바뀌면 이 값들 중 하나가 바뀐다. (지역, 장소 유형의 이름 변경은 반영하지 않음)
+    """
+    if is_stream_request(request):
+        return None
+
+    try:
+        limit  = get_page_limit(request)
+        places = filter_places(request)
+    except ValueError:
+        return None
+
+    rows = places.values_list('id', 'updated_at', 'place_type_id', 'region_id', 'checkin_count', 'review_count')[:limit + 1]
+    return make_etag(limit, list(rows))
 
-REGEX_ROAD_ADDRESS = '(([가-힣A-Za-z·\d~\-\.]{2,}(로|길).[\d]+)|([가-힣A-Za-z·\d~\-\.]+(읍|동)\s)[\d]+)'
 
 class PlaceCreateView(View):
     def post(self, request):
         try:
             data = json.loads(request.body)
-            place_type = PlaceType.objects.get(name = data['place_type'])
-            metro_region = MetroRegion.objects.get(name=data['metro_region'])
-            local_region = LocalRegion.objects.get(name=data['local_region'], metro_region = metro_region)
+            place_type_id   = lookup_cache.place_type_id(data['place_type'])
+            metro_region_id = lookup_cache.metro_region_id(data['metro_region'])
+            local_region_id = lookup_cache.local_region_id(metro_region_id, data['local_region'])
             road_address = data['road_address']
             name = data['name']
+            latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
             
             assert re.match(REGEX_ROAD_ADDRESS, road_address), "INVALID_ROAD_ADDRESS_FORMAT"
 
-            if Place.objects.filter(name = name, place_type = place_type, road_address = road_address, region = local_region, deleted_at = None).exists():
-                return JsonResponse({"message": "EXIST_PLACE"}, status = 400)
-            
-            Place.objects.create(
-                    name         = name,
-                    place_type   = place_type,
-                    road_address = road_address,
-                    region       = local_region
-            )
+            with transaction.atomic():
+                Place.objects.create(
+                        name          = name,
+                        place_type_id = place_type_id,
+                        road_address  = road_address,
+                        region_id     = local_region_id,
+                        latitude      = latitude,
+                        longitude     = longitude
+                )
             return JsonResponse({"message": "PLACE_CREATED"}, status = 201)
         
         except json.JSONDecodeError as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
         except KeyError:
             return JsonResponse({"message": "KEY_ERROR"}, status = 400)
-        except AssertionError as e:
+        except (AssertionError, ValueError) as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
         except PlaceType.DoesNotExist:
             return JsonResponse({"message": "INVALID_PLACE_TYPE"}, status = 401)
@@ -44,22 +128,171 @@ class PlaceCreateView(View):
             return JsonResponse({"message": "INVALID_REGION"}, status = 401)
         except LocalRegion.DoesNotExist:
             return JsonResponse({"message": "INVALID_REGION"}, status = 401)
+        except IntegrityError:
+            return JsonResponse({"message": "EXIST_PLACE"}, status = 400)
     
+    @method_decorator(condition(etag_func = place_list_etag))
     def get(self, request):
-        places = Place.objects.select_related('place_type', 'region', 'region__metro_region').filter(deleted_at__isnull = True)
+        try:
+            limit  = get_page_limit(request)
+            places = PLACE_PROJECTION.values(filter_places(request), 'id')
 
-        result = [
-                    {
-                        "id"           : place.id,
-                        "name"         : place.name,
-                        "type"         : place.place_type.name,
-                        "road_address" : place.road_address,
-                        "local_region" : place.region.name,
-                        "metro_region" : place.region.metro_region.name
-                    } for place in places
-                ]
-        return JsonResponse({"result": result}, status = 200)
+            if is_stream_request(request):
+                return stream_json_list(places, PLACE_PROJECTION.to_dict)
 
+            rows        = list(places[:limit + 1])
+            next_cursor = encode_cursor(rows[limit - 1][-1]) if len(rows) > limit else None
+
+            return json_response({"result": PLACE_PROJECTION.serialize(rows[:limit]), "next": next_cursor}, status = 200)
+
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+
+
+class AsyncPlaceCreateView(AsyncView):
+    """PlaceCreateView의 비동기 버전 (ASGI)
+
+    Django 3.1의 ASGI 핸들러는 스트리밍 응답을 이벤트 루프에서 읽으므로 stream 요청은 지원하지 않는다.
+    """
+    post = db_handler(PlaceCreateView.post)
+
+    async def get(self, request):
+        if is_stream_request(request):
+            return JsonResponse({"message": "STREAM_NOT_SUPPORTED"}, status = 400)
+        return await run_db(PlaceCreateView.get, self, request)
+
+
+class PlaceImportView(View):
+    CONTENT_TYPE_FORMATS = {
+        'text/csv'             : 'csv',
+        'application/x-ndjson' : 'ndjson',
+    }
+
+    def post(self, request):
+        """CSV 또는 NDJSON 본문으로 장소 일괄 등록"""
+        try:
+            file_format = self.CONTENT_TYPE_FORMATS.get(request.content_type)
+            assert file_format, "INVALID_CONTENT_TYPE"
+
+            report = import_places(read_rows(request, file_format))
+            return JsonResponse({"message": "PLACES_IMPORTED", **report}, status = 201)
+
+        except AssertionError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+
+
+class PlaceTrendingView(View):
+    def get(self, request):
+        """광역 지역(및 장소 유형)별 인기 장소 조회"""
+        try:
+            limit           = get_page_limit(request)
+            metro_region_id = lookup_cache.metro_region_id(request.GET['metro_region'])
+            place_type      = request.GET.get('place_type')
+            place_type_id   = lookup_cache.place_type_id(place_type) if place_type else None
+
+            now    = timezone.now()
+            trends = PLACE_PROJECTION.values(top_places(metro_region_id, place_type_id, limit), 'score', prefix = 'place__')
+            result = [
+                        {
+                            **PLACE_PROJECTION.to_dict(row),
+                            "score": round(decayed_score(row[-1], now), 4)
+                        } for row in trends
+                    ]
+            return json_response({"result": result}, status = 200)
+
+        except KeyError:
+            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+        except MetroRegion.DoesNotExist:
+            return JsonResponse({"message": "INVALID_REGION"}, status = 400)
+        except PlaceType.DoesNotExist:
+            return JsonResponse({"message": "INVALID_PLACE_TYPE"}, status = 400)
+
+
+class PlaceAutocompleteView(View):
+    def get(self, request):
+        """장소 이름 자동완성 (이름 접두어 또는 초성, metro_region으로 범위 지정)"""
+        try:
+            limit           = get_page_limit(request)
+            metro_region    = request.GET.get('metro_region')
+            metro_region_id = lookup_cache.metro_region_id(metro_region) if metro_region else None
+
+            result = place_name_index.search(request.GET['q'], metro_region_id, limit)
+            return json_response({"result": result}, status = 200)
+
+        except KeyError:
+            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+        except MetroRegion.DoesNotExist:
+            return JsonResponse({"message": "INVALID_REGION"}, status = 400)
+
+
+class PlaceNearbyView(View):
+    def get(self, request):
+        """좌표 기준 반경 안의 장소를 가까운 순으로 조회 (place_type으로 필터)"""
+        try:
+            latitude, longitude = parse_coordinates(request.GET['lat'], request.GET['lng'])
+            radius              = get_radius(request)
+            limit               = get_page_limit(request)
+            cursor              = request.GET.get('cursor')
+            after               = tuple(decode_cursor(cursor, (float, int))) if cursor else None
+            place_types         = request.GET.getlist('place_type')
+
+            nearby = nearby_place_ids(
+                latitude, longitude, radius,
+                lookup_cache.place_type_ids(place_types) if place_types else None,
+                after = after,
+                limit = limit + 1
+            )
+            page   = nearby[:limit]
+            rows   = PLACE_PROJECTION.values(Place.objects.filter(id__in = [place_id for _, place_id in page]), 'id')
+            places = {row[-1]: PLACE_PROJECTION.to_dict(row) for row in rows}
+
+            result = [
+                        {
+                            **places[place_id],
+                            "distance": round(distance, 1)
+                        } for distance, place_id in page if place_id in places
+                    ]
+            next_cursor = encode_cursor(*page[-1]) if len(nearby) > limit else None
+            return json_response({"result": result, "next": next_cursor}, status = 200)
+
+        except KeyError:
+            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
+
+
+class PlaceChangesView(View):
+    def get(self, request):
+        """since 커서 이후 등록, 수정, 삭제된 장소를 변경 순서대로 조회 (커서가 없으면 처음부터)
+
+        삭제된 장소는 id와 deleted만 반환한다. 체크인 수, 리뷰 수 변경은 포함하지 않는다.
+        since 이후의 삭제 기록이 보관 정리(archive_deleted)로 이미 지워졌다면 410 RESYNC_REQUIRED를 반환한다.
+        next는 변경이 없어도 항상 반환하며 다음 요청의 since로 사용한다.
+        """
+        try:
+            limit = get_page_limit(request)
+            since = request.GET.get('since')
+            since, = decode_cursor(since, (int,)) if since else (0,)
+
+            if since and since < ChangeSequence.current(Place.PURGED_SEQUENCE):
+                return JsonResponse({"message": "RESYNC_REQUIRED"}, status = 410)
+
+            places = Place.all_objects.filter(change_seq__gt = since).order_by('change_seq')
+            rows   = list(PLACE_PROJECTION.values(places, 'deleted_at', 'change_seq')[:limit + 1])
+
+            result = [
+                        {"id": row[0], "deleted": True} if row[-2] else {**PLACE_PROJECTION.to_dict(row), "deleted": False}
+                        for row in rows[:limit]
+                    ]
+            last_seq = rows[:limit][-1][-1] if rows else since
+            return json_response({"result": result, "next": encode_cursor(last_seq), "has_more": len(rows) > limit}, status = 200)
+
+        except ValueError as e:
+            return JsonResponse({"message": f"{e}"}, status = 400)
 
 
 class PlaceView(View):
@@ -69,29 +302,36 @@ class PlaceView(View):
             
             data_keys = data.keys()
             
-            place_type = PlaceType.objects.get(name = data['place_type'])
-            metro_region = MetroRegion.objects.get(name=data['metro_region'])
-            local_region = LocalRegion.objects.get(name=data['local_region'], metro_region = metro_region)
+            place_type_id   = lookup_cache.place_type_id(data['place_type'])
+            metro_region_id = lookup_cache.metro_region_id(data['metro_region'])
+            local_region_id = lookup_cache.local_region_id(metro_region_id, data['local_region'])
             road_address = data['road_address']
             name = data['name']
+            has_coordinates = 'latitude' in data_keys or 'longitude' in data_keys
+            latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
 
             assert re.match(REGEX_ROAD_ADDRESS, road_address), "INVALID_ROAD_ADDRESS_FORMAT"
 
-            patch_object = Place.objects.get(id = place_pk)
+            patch_object = Place.all_objects.get(id = place_pk)
 
             if patch_object.deleted_at == None:
-                patch_object.place_type   = place_type
-                patch_object.region       = local_region
-                patch_object.road_address = road_address
-                patch_object.name         = name
-                patch_object.save()
+                patch_object.place_type_id = place_type_id
+                patch_object.region_id     = local_region_id
+                patch_object.road_address  = road_address
+                patch_object.name          = name
+                if has_coordinates:
+                    patch_object.latitude  = latitude
+                    patch_object.longitude = longitude
+                with transaction.atomic():
+                    patch_object.save()
+                    PlaceTrend.objects.filter(place_id = place_pk).update(metro_region_id = metro_region_id, place_type_id = place_type_id)
                 return JsonResponse({"message": "PLACE_UPDATED"}, status = 200)
             else:
                 return JsonResponse({"message": "DELETED_PLACE"}, status = 400)
 
         except json.JSONDecodeError as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
-        except AssertionError as e:
+        except (AssertionError, ValueError) as e:
             return JsonResponse({"message": f"{e}"}, status = 400)
         except Place.DoesNotExist:
             return JsonResponse({"message": "INVALID_PLACE"}, status = 401)
@@ -101,10 +341,12 @@ class PlaceView(View):
             return JsonResponse({"message": "INVALID_REGION"}, status = 401)
         except LocalRegion.DoesNotExist:
             return JsonResponse({"message": "INVALID_REGION"}, status = 401)
+        except IntegrityError:
+            return JsonResponse({"message": "EXIST_PLACE"}, status = 400)
 
     def delete(self, request, place_pk):
         try:
-            delete_object = Place.objects.get(id = place_pk)
+            delete_object = Place.all_objects.get(id = place_pk)
             
             if delete_object.deleted_at == None:
                 delete_object.deleted_at = timezone.now()
@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.views import View
+
+_executor      = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers = settings.ASYNC_DB_WORKERS, thread_name_prefix = 'async-db')
+        return _executor
+
+
+def _run_with_connection(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 DB 작업을 ASYNC_DB_WORKERS 크기의 스레드 풀에서 실행하고 결과를 기다림
+
+    Django 3.1의 ASGI 핸들러는 동기 뷰를 모두 한 스레드에서 차례로 실행하므로,
+    DB 작업을 별도 풀로 보내 요청 동시성이 스레드 하나에 묶이지 않게 한다.
+    각 풀 스레드는 자기 DB 연결을 쓰며, 작업 전후로 오래된 연결을 정리한다.
+    ASYNC_DB_WORKERS가 0이면 asgiref 기본 동작대로 요청 스레드에서 실행한다. (테스트용)
+    """
+    if not settings.ASYNC_DB_WORKERS:
+        return await sync_to_async(func, thread_sensitive = True)(*args, **kwargs)
+
+    loop    = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_db_executor(),
+        functools.partial(context.run, _run_with_connection, func, *args, **kwargs)
+    )
+
+
+def db_handler(handler):
+    """동기 뷰 핸들러를 run_db로 실행하는 비동기 핸들러로 변환
+
+    id_auth 등 데코레이터는 벗겨내므로, 비동기 핸들러에 다시 적용해 이벤트 루프에서 실행한다.
+    """
+    handler = inspect.unwrap(handler)
+
+    @functools.wraps(handler)
+    async def async_handler(self, request, *args, **kwargs):
+        return await run_db(handler, self, request, *args, **kwargs)
+    return async_handler
+
+
+class AsyncView(View):
+    """핸들러가 코루틴인 클래스 기반 뷰 (Django 3.1의 View는 비동기 핸들러를 지원하지 않는다)"""
+    @classmethod
+    def as_view(cls, **initkwargs):
+        super().as_view(**initkwargs)
+
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.dispatch(request, *args, **kwargs)
+
+        view.view_class      = cls
+        view.view_initkwargs = initkwargs
+        view.__doc__         = cls.__doc__
+        view.__module__      = cls.__module__
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.http_method_names:
+            handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+        else:
+            handler = self.http_method_not_allowed
+
+        response = handler(request, *args, **kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
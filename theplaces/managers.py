@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class LiveManager(models.Manager):
+    """삭제되지 않은(deleted_at이 비어 있는) 행만 다루는 기본 매니저
+
+    삭제된 행까지 필요하면 모델의 all_objects 매니저를 사용한다.
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull = True)
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+
+import jwt
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import Resolver404, resolve
+
+from user.utils import get_token_payload
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# 마지막 쓰기 시각(epoch 초)을 담는 쿠키 (어느 워커에서 쓰기를 했든 다음 읽기를 primary로 보낸다)
+STICKY_COOKIE = 'last_write'
+
+# 현재 요청의 읽기 DB 별칭 (None이면 primary)
+_read_alias = ContextVar('read_alias', default = None)
+
+
+def sticky_key(user_id):
+    return f'db-sticky:{user_id}'
+
+
+def get_request_user_id(request):
+    """Authorization 토큰의 유저 id (토큰이 없거나 잘못되었으면 None)"""
+    try:
+        return get_token_payload(request)['id']
+    except (AttributeError, KeyError, jwt.exceptions.PyJWTError):
+        return None
+
+
+def reads_from_replica(request):
+    """요청 경로의 뷰가 replica 읽기를 허용하는지 (뷰 클래스의 read_replica, 기본 True)"""
+    try:
+        view = resolve(request.path_info).func
+    except Resolver404:
+        return False
+    return getattr(getattr(view, 'view_class', view), 'read_replica', True)
+
+
+def is_sticky(request):
+    """최근 DATABASE_STICKY_SECONDS 안에 쓰기를 한 클라이언트인지 확인
+
+    last_write 쿠키로 판단하며, DATABASE_STICKY_CACHE_ALIAS가 지정되어 있으면 토큰 유저 기준 기록도 확인한다.
+    """
+    try:
+        last_write = float(request.COOKIES.get(STICKY_COOKIE, ''))
+    except ValueError:
+        last_write = None
+    if last_write is not None and time.time() - last_write < settings.DATABASE_STICKY_SECONDS:
+        return True
+
+    alias = settings.DATABASE_STICKY_CACHE_ALIAS
+    if alias:
+        user_id = get_request_user_id(request)
+        return user_id is not None and bool(caches[alias].get(sticky_key(user_id)))
+    return False
+
+
+def choose_read_alias(request):
+    """요청의 읽기 DB 별칭을 선택 (primary에서 읽어야 하면 None)
+
+    안전한 메서드이고, 뷰가 허용하며, 클라이언트가 최근 DATABASE_STICKY_SECONDS 안에 쓰기를 하지 않은 경우에만
+    DATABASE_READ_REPLICAS 중 하나를 고른다.
+    """
+    replicas = settings.DATABASE_READ_REPLICAS
+    if not replicas or request.method not in SAFE_METHODS or not reads_from_replica(request):
+        return None
+    if is_sticky(request):
+        return None
+    return random.choice(replicas)
+
+
+def mark_sticky(request, response):
+    """쓰기에 성공한 클라이언트의 이후 읽기를 DATABASE_STICKY_SECONDS 동안 primary로 고정
+
+    인증 여부와 관계없이 last_write 쿠키를 내려주고, 공유 캐시가 지정되어 있으면 토큰 유저 기준으로도 기록한다.
+    """
+    if request.method in SAFE_METHODS or response.status_code >= 400 or not settings.DATABASE_READ_REPLICAS:
+        return
+
+    response.set_cookie(STICKY_COOKIE, f'{time.time():.3f}', max_age = settings.DATABASE_STICKY_SECONDS, httponly = True, samesite = 'Lax')
+
+    alias = settings.DATABASE_STICKY_CACHE_ALIAS
+    if alias:
+        user_id = get_request_user_id(request)
+        if user_id is not None:
+            caches[alias].set(sticky_key(user_id), True, settings.DATABASE_STICKY_SECONDS)
+
+
+def check_sticky_cache():
+    """DATABASE_STICKY_CACHE_ALIAS는 모든 워커가 공유하는 캐시여야 한다 (locmem이면 다른 워커에서 보이지 않는다)"""
+    alias = settings.DATABASE_STICKY_CACHE_ALIAS
+    if alias and isinstance(caches[alias], LocMemCache):
+        raise ImproperlyConfigured(f"DATABASE_STICKY_CACHE_ALIAS '{alias}' must be a cache shared by all workers, not LocMemCache.")
+
+
+class ReplicaRouter:
+    """읽기는 ReplicaMiddleware가 고른 별칭으로, 쓰기와 마이그레이션은 항상 primary(default)로 보내는 라우터
+
+    요청 밖(관리 명령, 테스트 등)에서는 읽기도 primary를 사용한다.
+    """
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name = None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """요청마다 읽기 DB를 정하고, 쓰기에 성공한 클라이언트를 sticky 상태로 기록하는 미들웨어
+
+    선택한 별칭은 contextvar에 담기므로 run_db의 스레드 풀에서도 그대로 적용된다.
+    """
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        check_sticky_cache()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        token = _read_alias.set(choose_read_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        mark_sticky(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _read_alias.set(choose_read_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        mark_sticky(request, response)
+        return response
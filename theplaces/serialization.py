@@ -0,0 +1,69 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField
+from django.db.models.functions import Cast, Substr, TruncDate
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_json(data):
+    """JSON 바이트로 인코딩 (orjson이 설치되어 있으면 orjson 사용)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls = DjangoJSONEncoder, ensure_ascii = False, separators = (',', ':')).encode('utf-8')
+
+
+def json_response(data, status = 200):
+    """dumps_json으로 인코딩한 JSON 응답 (JsonResponse 대신 목록 API에서 사용)"""
+    return HttpResponse(dumps_json(data), status = status, content_type = 'application/json')
+
+
+def date_string(field):
+    """datetime 필드를 DB에서 바로 'YYYY-MM-DD' 문자열로 읽는 식
+
+    DB 연결은 UTC로 동작하므로 기존 created_at.strftime('%Y-%m-%d')와 같은 값이며,
+    행마다 datetime 객체를 만들고 포맷하는 비용이 없다.
+    """
+    return Substr(Cast(field, output_field = CharField()), 1, 10)
+
+
+def local_date_string(field):
+    """datetime 필드를 현지 시간(TIME_ZONE) 기준 'YYYY-MM-DD' 문자열로 읽는 식"""
+    return date_string(TruncDate(field))
+
+
+class Projection:
+    """응답 키 → 필드 경로(또는 식) 매핑으로 필요한 컬럼만 values_list로 읽어 dict로 변환
+
+    모델 인스턴스와 조인 객체를 만들지 않는다. values()에 추가 컬럼을 넘기면 행 끝에 붙으며,
+    to_dict()는 응답 키에 해당하는 앞쪽 컬럼만 사용한다. (커서 계산용 값 등)
+    """
+    def __init__(self, **fields):
+        self.fields = fields
+        self.keys   = tuple(fields)
+
+    def values(self, queryset, *extra, prefix = ''):
+        """queryset을 (응답 컬럼..., 추가 컬럼...) 튜플의 values_list로 변환 (prefix: 관계 경로 접두어)"""
+        annotations = {}
+        paths       = []
+        for key, field in self.fields.items():
+            if isinstance(field, str):
+                paths.append(prefix + field)
+            else:
+                annotations[f'projected_{key}'] = field
+                paths.append(f'projected_{key}')
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset.values_list(*paths, *extra)
+
+    def to_dict(self, row):
+        return dict(zip(self.keys, row))
+
+    def serialize(self, rows):
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from local_settings import SECRET_KEY
 
@@ -55,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'theplaces.routers.ReplicaMiddleware',
 ]
 
 
@@ -89,6 +91,46 @@ DATABASES = {
     }
 }
 
+# 읽기 전용 replica DB 파일 목록 (THEPLACES_DB_REPLICAS, 쉼표로 구분)
+# 로컬에서는 primary 파일을 복사한 SQLite 파일로 대신하며, 읽기 전용(mode=ro)으로 연결한다.
+for index, replica in enumerate(filter(None, os.environ.get('THEPLACES_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{Path(replica).resolve()}?mode=ro',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# GET 요청의 읽기를 보낼 DB 별칭 (비어 있으면 모든 요청이 primary 사용)
+DATABASE_READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['theplaces.routers.ReplicaRouter']
+
+# 쓰기에 성공한 클라이언트의 읽기를 primary로 고정하는 시간 (초, last_write 쿠키로 전달)
+DATABASE_STICKY_SECONDS     = 5
+
+# 쿠키를 보내지 않는 클라이언트를 위해 토큰 유저 기준으로도 기록할 CACHES 별칭 (모든 워커가 공유하는 캐시만 가능, locmem 불가)
+DATABASE_STICKY_CACHE_ALIAS = None
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reviews': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'reviews',
+        'TIMEOUT': 300,
+    },
+}
+
+# 리뷰 목록 페이지 캐시에 사용할 CACHES 별칭
+# 무효화 버전은 DB(places.review_version)에 있으므로 locmem이어도 오래된 페이지를 반환하지 않지만,
+# 페이지는 프로세스마다 따로 저장된다. 워커가 많으면 공유 백엔드(memcached 등)를 지정한다.
+REVIEW_CACHE_ALIAS = 'reviews'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -132,6 +174,57 @@ STATIC_URL = '/static/'
 #REMOVE_APPEND_SLASH_WARNING
 APPEND_SLASH = False
 
+##USER
+# id_auth 인증 유저 캐시 유지 시간 (초) 및 최대 보관 수
+USER_CACHE_TTL  = 60
+USER_CACHE_SIZE = 10000
+
+# 비밀번호 해시 비용 (변경 시 로그인할 때 새 비용으로 다시 해시)
+BCRYPT_ROUNDS = 12
+
+# 프로세스당 동시 비밀번호 해시 수, 대기열 크기, 대기 제한 시간 (초)
+# ASGI의 비동기 회원가입/로그인 뷰에만 적용된다. (WSGI 동기 워커는 요청 스레드에서 바로 해시하므로 워커 수가 곧 한도)
+# 워커 프로세스마다 따로 적용되므로 서버 전체 한도는 프로세스 수를 곱한 값이다.
+PASSWORD_HASH_WORKERS    = 4
+PASSWORD_HASH_QUEUE_SIZE = 16
+PASSWORD_HASH_TIMEOUT    = 5
+
+##PLACE
+# 광역 지역, 지역, 장소 유형 이름 조회 캐시 유지 시간 (초)
+PLACE_LOOKUP_CACHE_TTL = 300
+
+# 조회 캐시에 없는 이름이 들어왔을 때 DB를 다시 읽는 최소 간격 (초, 다른 프로세스에서 추가된 값 반영)
+PLACE_LOOKUP_MISS_RELOAD_INTERVAL = 5
+
+# 장소 이름 자동완성 인덱스를 DB에서 다시 읽는 주기 (초, 백그라운드 스레드에서 다시 읽는다)
+PLACE_AUTOCOMPLETE_TTL = 600
+
+# 인기 장소 점수 반감기 (시간)
+TRENDING_HALF_LIFE_HOURS = 24
+
+# 주변 장소 검색 기본 / 최대 반경 (m)
+NEARBY_RADIUS_DEFAULT = 1000
+NEARBY_RADIUS_MAX     = 20000
+
+##ARCHIVE
+# 일괄 체크인 요청 한 번에 받을 수 있는 최대 체크인 수
+CHECKIN_BATCH_MAX = 100
+
+# 일괄 체크인으로 받을 수 있는 체크인 시각 범위 (과거 일수, 미래 허용 오차 초)
+CHECKIN_BATCH_MAX_AGE_DAYS = 7
+CHECKIN_BATCH_CLOCK_SKEW   = 300
+
+# 삭제(deleted_at) 후 보관 기간이 지난 행을 옮겨 둘 디렉터리와 보관 기간 (일)
+SOFT_DELETE_ARCHIVE_DIR    = BASE_DIR / 'archives'
+SOFT_DELETE_RETENTION_DAYS = 90
+
+##ASGI
+# 체크인, 리뷰, 장소 목록 API를 비동기 뷰로 연결 (asgi.py에서 기본으로 켠다)
+ASYNC_VIEWS = os.environ.get('THEPLACES_ASYNC_VIEWS') == '1'
+
+# 비동기 뷰의 DB 작업을 실행하는 스레드 수 (0이면 요청 스레드에서 실행)
+ASYNC_DB_WORKERS = 16
+
 ##CORS
 CORS_ORIGIN_ALLOW_ALL=True
 CORS_ALLOW_CREDENTIALS = True
@@ -0,0 +1,113 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .serialization import dumps_json
+
+PAGE_LIMIT_DEFAULT = 20
+PAGE_LIMIT_MAX     = 100
+STREAM_CHUNK_SIZE  = 500
+
+
+def get_page_limit(request):
+    """limit 쿼리 파라미터를 읽어 최대 페이지 크기로 제한"""
+    try:
+        limit = int(request.GET.get('limit', PAGE_LIMIT_DEFAULT))
+    except ValueError:
+        raise ValueError("INVALID_LIMIT")
+
+    if limit < 1:
+        raise ValueError("INVALID_LIMIT")
+    return min(limit, PAGE_LIMIT_MAX)
+
+
+def encode_cursor(*values):
+    """키셋 페이지네이션 키를 불투명한 커서 문자열로 인코딩"""
+    raw = json.dumps(values, separators = (',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """encode_cursor로 만든 커서를 types 순서의 키 값 리스트로 디코딩"""
+    try:
+        raw    = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("INVALID_CURSOR")
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("INVALID_CURSOR")
+    if not all(isinstance(value, value_type) for value, value_type in zip(values, types)):
+        raise ValueError("INVALID_CURSOR")
+    return values
+
+
+def make_etag(*parts):
+    """응답 내용을 결정하는 값들로 만든 ETag (따옴표 제외)"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def decode_datetime(value):
+    """커서에 담긴 ISO 8601 문자열을 datetime으로 변환"""
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+
+    if parsed is None:
+        raise ValueError("INVALID_CURSOR")
+    return parsed
+
+
+def get_date_range(request, start_key = 'from', end_key = 'to'):
+    """YYYY-MM-DD 형식의 기간 쿼리 파라미터를 현지 시간 기준 [시작, 끝) datetime으로 변환"""
+    bounds = []
+    for key, offset in ((start_key, 0), (end_key, 1)):
+        value = request.GET.get(key)
+        if not value:
+            bounds.append(None)
+            continue
+
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValueError("INVALID_DATE")
+
+        bounds.append(timezone.make_aware(datetime.combine(date + timedelta(days = offset), time.min)))
+    return bounds
+
+
+def is_stream_request(request):
+    """stream 쿼리 파라미터로 스트리밍 응답을 요청했는지 확인"""
+    return request.GET.get('stream', '').lower() in ('1', 'true')
+
+
+def stream_json_list(queryset, serialize, key = 'result'):
+    """쿼리셋을 청크 단위로 읽으며 {key: [...]} 형태의 JSON을 스트리밍하는 응답
+
+    본문은 ReplicaMiddleware가 읽기 DB 별칭을 되돌린 뒤에 읽히므로, 응답을 만드는 시점의 별칭으로 쿼리셋을 고정한다.
+    """
+    queryset = queryset.using(queryset.db)
+
+    def generate():
+        yield b'{"%s":[' % key.encode('utf-8')
+        separator = b''
+        chunk     = []
+        for row in queryset.iterator(chunk_size = STREAM_CHUNK_SIZE):
+            chunk.append(separator + dumps_json(serialize(row)))
+            separator = b','
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield b''.join(chunk)
+                chunk = []
+        chunk.append(b']}')
+        yield b''.join(chunk)
+
+    return StreamingHttpResponse(generate(), content_type = 'application/json')
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import User
+
+
+class UserCache:
+    """인증된 유저 조회 캐시 (프로세스 단위, LRU + TTL)
+
+    USER_CACHE_SIZE개까지 최근 사용 순으로 보관하며, USER_CACHE_TTL이 지나거나
+    유저 행이 저장/삭제되면 다시 조회한다. 반환된 인스턴스는 요청 간에 공유되므로 수정하지 않는다.
+    """
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._users = OrderedDict()
+        self._live  = OrderedDict()
+
+    def _store(self, entries, user_id, value, now):
+        entries[user_id] = (value, now + settings.USER_CACHE_TTL)
+        entries.move_to_end(user_id)
+        while len(entries) > settings.USER_CACHE_SIZE:
+            entries.popitem(last = False)
+
+    def get(self, user_id):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry and entry[1] > now:
+                self._users.move_to_end(user_id)
+                return entry[0]
+
+        user = User.objects.get(id = user_id)
+
+        with self._lock:
+            self._store(self._users, user_id, user, now)
+        return user
+
+    def check_live(self, user_id):
+        """유저 행을 읽지 않고 삭제되지 않은 유저인지 확인 (아니면 User.DoesNotExist)
+
+        캐시된 유저나 확인 결과가 있으면 조회하지 않으며, 없으면 exists()로 확인한 결과를 USER_CACHE_TTL 동안 보관한다.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            for entries in (self._users, self._live):
+                entry = entries.get(user_id)
+                if entry and entry[1] > now:
+                    entries.move_to_end(user_id)
+                    return
+
+        if not User.objects.filter(id = user_id).exists():
+            raise User.DoesNotExist
+
+        with self._lock:
+            self._store(self._live, user_id, True, now)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+            self._live.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._live.clear()
+
+
+user_cache = UserCache()
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+
+class PasswordPoolBusy(Exception):
+    """비밀번호 해시 작업 대기열이 가득 찼거나 제한 시간 안에 끝나지 않은 경우"""
+
+
+class PasswordHasherPool:
+    """비동기 뷰(ASGI)의 bcrypt 해시/검증 작업을 스레드 풀에서 실행하는 프로세스 단위 admission control
+
+    이벤트 루프 하나가 많은 요청을 동시에 받으므로, 동시에 실행되는 해시 수를 workers로 묶고
+    실행 중인 작업과 대기 중인 작업의 합이 workers + queue_size를 넘으면 기다리지 않고 PasswordPoolBusy를 발생시킨다.
+    timeout 안에 끝나지 않아도 PasswordPoolBusy를 발생시킨다. (작업 자체는 끝까지 실행된 뒤 자리를 반환한다)
+    동기 뷰(WSGI)는 요청 스레드에서 바로 해시하므로 이 풀을 사용하지 않는다.
+    """
+    def __init__(self, workers, queue_size, timeout):
+        self.timeout   = timeout
+        self._executor = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = 'password-hasher')
+        self._slots    = threading.BoundedSemaphore(workers + queue_size)
+
+    def _release_after(self, func, *args):
+        try:
+            return func(*args)
+        finally:
+            self._slots.release()
+
+    async def run(self, func, *args):
+        if not self._slots.acquire(blocking = False):
+            raise PasswordPoolBusy
+
+        try:
+            future = self._executor.submit(self._release_after, func, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordPoolBusy
+
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHasherPool(
+                workers    = settings.PASSWORD_HASH_WORKERS,
+                queue_size = settings.PASSWORD_HASH_QUEUE_SIZE,
+                timeout    = settings.PASSWORD_HASH_TIMEOUT
+            )
+        return _pool
+
+
+def _hash_password(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds = settings.BCRYPT_ROUNDS)).decode()
+
+
+def _check_password(password, hashed_password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def hash_password(password):
+    """BCRYPT_ROUNDS 비용으로 비밀번호 해시 생성"""
+    return _hash_password(password)
+
+
+def check_password(password, hashed_password):
+    """비밀번호가 해시와 일치하는지 검증"""
+    return _check_password(password, hashed_password)
+
+
+async def async_hash_password(password):
+    """hash_password의 비동기 버전 (해시 풀에서 실행, 풀이 가득 차면 PasswordPoolBusy)"""
+    return await get_pool().run(_hash_password, password)
+
+
+async def async_check_password(password, hashed_password):
+    """check_password의 비동기 버전 (해시 풀에서 실행, 풀이 가득 차면 PasswordPoolBusy)"""
+    return await get_pool().run(_check_password, password, hashed_password)
+
+
+def needs_rehash(hashed_password):
+    """해시의 비용이 현재 BCRYPT_ROUNDS와 다른지 확인 ($2b$<rounds>$...)"""
+    try:
+        return int(hashed_password.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
@@ -1,5 +1,7 @@
 from django.db import models
 
+from theplaces.managers import LiveManager
+
 class User(models.Model):
     """유저 테이블"""
     email      = models.EmailField()
@@ -9,6 +11,9 @@ class User(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True)
 
+    objects     = LiveManager()
+    all_objects = models.Manager()
+
     class Meta:
         db_table = 'users'
 
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import user_cache
+from .models import User
+
+
+@receiver(post_save, sender = User)
+@receiver(post_delete, sender = User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """유저 저장(소프트 삭제 포함) 또는 삭제 시 캐시에서 제거 (커밋 이후에도 한 번 더 제거)"""
+    user_cache.invalidate(instance.id)
+    transaction.on_commit(lambda: user_cache.invalidate(instance.id))
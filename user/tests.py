@@ -1,10 +1,18 @@
 import json
+import asyncio
+import threading
+from unittest import mock
 import bcrypt
 import jwt
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.utils import timezone
 
 from user.models import User
+from user.cache import user_cache
+from user.utils import LazyUser
+from user.hashing import PasswordHasherPool, PasswordPoolBusy
+from user.views import AsyncSignUpView, AsyncSignInView
 from local_settings import SECRET_KEY, ALGORITHM
 
 class SignUpTest(TestCase):
@@ -49,4 +57,132 @@ class SignInTest(TestCase):
 
         self.assertEquals(response.status_code, 200)
         self.assertEquals(response.json(), {'message': 'SUCCESS', 'access_token': response.json()['access_token']})
-        
+
+    @override_settings(BCRYPT_ROUNDS = 4)
+    def test_signin_rehash(self):
+        client = Client()
+        data = {
+                'email'   : 'test@test.com',
+                'password': 'Qwer1234!' 
+        }
+
+        response = client.post('/user/signin', json.dumps(data), content_type='application/json')
+
+        password = User.objects.get(email = 'test@test.com').password
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(password.startswith('$2b$04$'))
+        self.assertTrue(bcrypt.checkpw('Qwer1234!'.encode('utf-8'), password.encode('utf-8')))
+
+
+class PasswordHasherPoolTest(TestCase):
+    async def test_pool_busy(self):
+        pool    = PasswordHasherPool(workers = 1, queue_size = 0, timeout = 5)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_task():
+            started.set()
+            release.wait()
+
+        task = asyncio.ensure_future(pool.run(blocking_task))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+
+        with self.assertRaises(PasswordPoolBusy):
+            await pool.run(lambda: None)
+
+        release.set()
+        await task
+        self.assertEquals(await pool.run(lambda: 'done'), 'done')
+
+
+@override_settings(ASYNC_DB_WORKERS = 0, BCRYPT_ROUNDS = 4)
+class AsyncUserViewTest(TestCase):
+    def tearDown(self):
+        User.objects.all().delete()
+
+    async def test_async_signup_and_signin(self):
+        factory = RequestFactory()
+        data    = {
+                'email'    : 'test@test.com',
+                'password' : 'Qwer1234!',
+                'nickname' : 'testuser'
+                }
+
+        response = await AsyncSignUpView.as_view()(factory.post('/user/signup', json.dumps(data), content_type='application/json'))
+        self.assertEquals(response.status_code, 201)
+
+        response = await AsyncSignInView.as_view()(factory.post('/user/signin', json.dumps(data), content_type='application/json'))
+        self.assertEquals(response.status_code, 200)
+        self.assertIn('access_token', json.loads(response.content))
+
+    async def test_async_signup_pool_busy(self):
+        factory = RequestFactory()
+        data    = {
+                'email'    : 'test@test.com',
+                'password' : 'Qwer1234!',
+                'nickname' : 'testuser'
+                }
+
+        with mock.patch('user.views.async_hash_password', side_effect = PasswordPoolBusy):
+            response = await AsyncSignUpView.as_view()(factory.post('/user/signup', json.dumps(data), content_type='application/json'))
+
+        self.assertEquals(response.status_code, 503)
+        self.assertEquals(json.loads(response.content), {"message": "SERVER_BUSY"})
+
+
+class UserCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+
+    def tearDown(self):
+        User.objects.all().delete()
+
+    def test_cached_user(self):
+        user_cache.get(self.user.id)
+
+        with self.assertNumQueries(0):
+            self.assertEquals(user_cache.get(self.user.id).nickname, 'testuser')
+
+    def test_invalidate_on_save(self):
+        user_cache.get(self.user.id)
+
+        self.user.nickname = 'changeduser'
+        self.user.save()
+
+        self.assertEquals(user_cache.get(self.user.id).nickname, 'changeduser')
+
+
+class LazyUserTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email = 'test@test.com', password = 'password', nickname = 'testuser')
+        user_cache.clear()
+
+    def tearDown(self):
+        User.objects.all().delete()
+
+    def test_lazy_user(self):
+        lazy_user = LazyUser(self.user.id)
+
+        with self.assertNumQueries(0):
+            self.assertEquals(lazy_user.id, self.user.id)
+
+        with self.assertNumQueries(1):
+            self.assertEquals(lazy_user.nickname, 'testuser')
+
+    def test_check_live_cached(self):
+        user_cache.check_live(self.user.id)
+
+        with self.assertNumQueries(0):
+            user_cache.check_live(self.user.id)
+
+    def test_lazy_auth_deleted_user(self):
+        client = Client()
+        token  = jwt.encode({'id': self.user.id}, SECRET_KEY, algorithm = ALGORITHM)
+        user_cache.check_live(self.user.id)
+
+        self.user.deleted_at = timezone.now()
+        self.user.save()
+
+        response = client.delete('/archive/checkin/1', HTTP_AUTHORIZATION = token, content_type='application/json')
+        self.assertEquals(response.json(), {"message": "INVALID_USER"})
+        self.assertEquals(response.status_code, 400)
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from .views import SignUpView, SignInView
+from .views import SignUpView, AsyncSignUpView, SignInView, AsyncSignInView
+
+signup_view = AsyncSignUpView if settings.ASYNC_VIEWS else SignUpView
+signin_view = AsyncSignInView if settings.ASYNC_VIEWS else SignInView
 
 urlpatterns = [
-    path('/signup', SignUpView.as_view()),
-    path('/signin', SignInView.as_view()),
+    path('/signup', signup_view.as_view()),
+    path('/signin', signin_view.as_view()),
 
 ]
-
@@ -1,23 +1,58 @@
 import jwt
 import json
+import asyncio
 from functools import wraps
 
 from django.utils import timezone
 from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject
 
 from user.models import User
+from user.cache import user_cache
+from theplaces.async_views import run_db
 from local_settings import SECRET_KEY, ALGORITHM
 
-def id_auth(func):
+class LazyUser(SimpleLazyObject):
+    """JWT 클레임의 id만으로 만든 유저 프록시
+
+    id, pk는 바로 사용할 수 있고, 그 외 속성에 접근할 때 처음으로 유저를 조회한다.
+    """
+    def __init__(self, user_id):
+        super().__init__(lambda: user_cache.get(user_id))
+        self.__dict__['id'] = user_id
+        self.__dict__['pk'] = user_id
+
+
+def get_token_payload(request):
+    access_token = request.headers.get('Authorization')
+    access_token = access_token.split(' ')[-1]
+
+    return jwt.decode(access_token, SECRET_KEY, algorithms=ALGORITHM)
+
+
+def id_auth(func = None, lazy = False):
+    """Authorization 토큰을 검증하여 request.user에 로그인 유저를 담는 데코레이터
+
+    lazy=True이면 유저 행을 읽지 않고 토큰 클레임으로 만든 LazyUser를 담는다.
+    삭제된 유저의 토큰은 user_cache.check_live로 걸러낸다. request.user.id만 사용하는 핸들러에 사용한다.
+    비동기 핸들러에 적용하면 토큰은 이벤트 루프에서 검증하고 유저 조회만 run_db로 실행한다.
+    """
+    if func is None:
+        return lambda func: id_auth(func, lazy = lazy)
+
+    if asyncio.iscoroutinefunction(func):
+        return async_id_auth(func, lazy)
+
     @wraps(func)
     def decorated_function(self, request, *args, **kwargs):
         try:
-            access_token = request.headers.get('Authorization')
-            access_token = access_token.split(' ')[-1]
-
-            payload      = jwt.decode(access_token, SECRET_KEY, algorithms=ALGORITHM)
+            payload      = get_token_payload(request)
 
-            login_user   = User.objects.get(id = payload['id'])
+            if lazy:
+                user_cache.check_live(payload['id'])
+                login_user = LazyUser(payload['id'])
+            else:
+                login_user = user_cache.get(payload['id'])
 
             request.user = login_user
             return func(self, request, *args, **kwargs)
@@ -30,3 +65,27 @@ def id_auth(func):
             return JsonResponse({"message": "INVALID_USER"}, status = 400)
     return decorated_function
 
+
+
+def async_id_auth(func, lazy):
+    @wraps(func)
+    async def decorated_function(self, request, *args, **kwargs):
+        try:
+            payload      = get_token_payload(request)
+
+            if lazy:
+                await run_db(user_cache.check_live, payload['id'])
+                login_user = LazyUser(payload['id'])
+            else:
+                login_user = await run_db(user_cache.get, payload['id'])
+
+            request.user = login_user
+            return await func(self, request, *args, **kwargs)
+
+        except jwt.ExpiredSignatureError:
+            return JsonResponse({"message": "EXPIRED_TOKEN"}, status = 400)
+        except jwt.exceptions.DecodeError:
+            return JsonResponse({"message": "INVALID_TOKEN"}, status = 400)
+        except User.DoesNotExist:
+            return JsonResponse({"message": "INVALID_USER"}, status = 400)
+    return decorated_function
@@ -8,30 +8,62 @@ from django.views import View
 from django.utils import timezone
 
 import jwt
-import bcrypt
 
 from .models import User
+from .hashing import PasswordPoolBusy, hash_password, check_password, async_hash_password, async_check_password, needs_rehash
+from theplaces.async_views import AsyncView, run_db
 from local_settings import SECRET_KEY, ALGORITHM
 
 REGEX_EMAIL = '([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+(\.[a-zA-Z]{2,4}))'
 REGEX_PASSWORD = '^(?=.*[A-Za-z])(?=.*\d)(?=.*[$@$!%*#?&])[A-Za-z\d$@$!%*#?&]{8,}$'
 
 
+def read_signup(request):
+    """회원가입 요청 본문을 검증하여 (닉네임, 이메일, 비밀번호) 반환"""
+    data     = json.loads(request.body)
+    nickname = data['nickname']
+    email    = data['email']
+    password = data['password']
+
+    assert re.match(REGEX_EMAIL, email), "INVALID_EMAIL_FORMAT"
+    assert re.match(REGEX_PASSWORD, password), "INVALID_PASSWORD_FORMAT"
+    return nickname, email, password
+
+
+def check_signup_available(nickname, email):
+    assert not User.objects.filter(email=email), "ALREADY_EXISTS_ACCOUNT"
+    assert not User.objects.filter(nickname = nickname), "ALREADY_EXISTS_NICKNAME"
+
+
+def issue_access_token(user):
+    access_token = jwt.encode({'id': user.id, 'exp': timezone.localtime() + timedelta(hours=24)}, SECRET_KEY, algorithm=ALGORITHM)
+    access_token = jwt.encode({'id': user.id}, SECRET_KEY, algorithm=ALGORITHM)
+    return access_token
+
+
+def user_error_response(error):
+    """회원가입, 로그인 뷰에서 공통으로 처리하는 예외의 응답"""
+    if isinstance(error, json.JSONDecodeError):
+        return JsonResponse({"message": f"{error}"}, status = 400)
+    if isinstance(error, KeyError):
+        return JsonResponse({"message": "KEY_ERROR"}, status = 400)
+    if isinstance(error, AssertionError):
+        return JsonResponse({"message": f"{error}"}, status = 400)
+    if isinstance(error, User.DoesNotExist):
+        return JsonResponse({"message": "INVALID_USER_EMAIL_OR_PASSWORD"}, status = 401)
+    return JsonResponse({"message": "SERVER_BUSY"}, status = 503)
+
+
+USER_ERRORS = (json.JSONDecodeError, KeyError, AssertionError, User.DoesNotExist, PasswordPoolBusy)
+
+
 class SignUpView(View):
     def post(self, request):
         try:
-            data     = json.loads(request.body)
-            nickname = data['nickname']
-            email    = data['email']
-            password = data['password']
+            nickname, email, password = read_signup(request)
+            check_signup_available(nickname, email)
 
-            assert re.match(REGEX_EMAIL, email), "INVALID_EMAIL_FORMAT"
-            assert re.match(REGEX_PASSWORD, password), "INVALID_PASSWORD_FORMAT"
-
-            assert not User.objects.filter(email=email), "ALREADY_EXISTS_ACCOUNT"
-            assert not User.objects.filter(nickname = nickname), "ALREADY_EXISTS_NICKNAME"
-
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode()
+            hashed_password = hash_password(password)
 
             User.objects.create(
                     email = email,
@@ -41,12 +73,23 @@ class SignUpView(View):
 
             return JsonResponse({"message": "SUCCESS"}, status = 201)
 
-        except json.JSONDecodeError as e:
-            return JsonResponse({"message": f"{e}"}, status = 400)
-        except KeyError:
-            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
-        except AssertionError as e:
-            return JsonResponse({"message": f"{e}"}, status = 400)
+        except USER_ERRORS as e:
+            return user_error_response(e)
+
+class AsyncSignUpView(AsyncView):
+    """SignUpView의 비동기 버전 (ASGI, 해시는 PasswordHasherPool에서 실행)"""
+    async def post(self, request):
+        try:
+            nickname, email, password = read_signup(request)
+            await run_db(check_signup_available, nickname, email)
+
+            hashed_password = await async_hash_password(password)
+
+            await run_db(User.objects.create, email = email, password = hashed_password, nickname = nickname)
+            return JsonResponse({"message": "SUCCESS"}, status = 201)
+
+        except USER_ERRORS as e:
+            return user_error_response(e)
 
 class SignInView(View):
     def post(self, request):
@@ -56,19 +99,38 @@ class SignInView(View):
             password    = data['password']
             signin_user = User.objects.get(email = email)
 
-            if bcrypt.checkpw(password.encode('utf-8'), signin_user.password.encode('utf-8')):
-                access_token = jwt.encode({'id': signin_user.id, 'exp': timezone.localtime() + timedelta(hours=24)}, SECRET_KEY, algorithm=ALGORITHM)
-                access_token = jwt.encode({'id': signin_user.id}, SECRET_KEY, algorithm=ALGORITHM)
-                
+            if check_password(password, signin_user.password):
+                if needs_rehash(signin_user.password):
+                    signin_user.password = hash_password(password)
+                    signin_user.save(update_fields = ['password', 'updated_at'])
 
-                return JsonResponse({"message": "SUCCESS", "access_token": access_token}, status = 200)
+                return JsonResponse({"message": "SUCCESS", "access_token": issue_access_token(signin_user)}, status = 200)
             else:
                 return JsonResponse({"message": "INVALID_USER_EMAIL_OR_PASSWORD"}, status = 401)
 
+        except USER_ERRORS as e:
+            return user_error_response(e)
+
+class AsyncSignInView(AsyncView):
+    """SignInView의 비동기 버전 (ASGI, 해시 검증은 PasswordHasherPool에서 실행)"""
+    async def post(self, request):
+        try:
+            data        = json.loads(request.body)
+            email       = data['email']
+            password    = data['password']
+            signin_user = await run_db(User.objects.get, email = email)
+
+            if not await async_check_password(password, signin_user.password):
+                return JsonResponse({"message": "INVALID_USER_EMAIL_OR_PASSWORD"}, status = 401)
+
+            if needs_rehash(signin_user.password):
+                try:
+                    signin_user.password = await async_hash_password(password)
+                    await run_db(signin_user.save, update_fields = ['password', 'updated_at'])
+                except PasswordPoolBusy:
+                    pass
+
+            return JsonResponse({"message": "SUCCESS", "access_token": issue_access_token(signin_user)}, status = 200)
 
-        except json.JSONDecodeError as e:
-            return JsonResponse({"message": f"{e}"}, status = 400)
-        except KeyError:
-            return JsonResponse({"message": "KEY_ERROR"}, status = 400)
-        except User.DoesNotExist:
-            return JsonResponse({"message": "INVALID_USER_EMAIL_OR_PASSWORD"}, status = 401)
+        except USER_ERRORS as e:
+            return user_error_response(e)